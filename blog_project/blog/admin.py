@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Post, Category, Tag, PostImage, Reaction
+from .pagination import EstimatedCountPaginator
 
 class PostImageInline(admin.TabularInline):
     model = PostImage
@@ -7,11 +8,15 @@ class PostImageInline(admin.TabularInline):
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'created_at', 'updated_at', 'published')
-    list_filter = ('published', 'created_at', 'categories', 'tags')
-    search_fields = ('title', 'content')
+    list_select_related = ('author',)
+    # Categories are few, so listing them all in the sidebar is cheap; tags
+    # are not, and are left to the autocomplete on the change form
+    list_filter = ('published', 'created_at', 'categories')
+    search_fields = ('title', 'slug')
     prepopulated_fields = {'slug': ('title',)}
-    date_hierarchy = 'created_at'
-    filter_horizontal = ('categories', 'tags')
+    autocomplete_fields = ('author', 'categories', 'tags')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ('created_at', 'updated_at')
     inlines = [PostImageInline]
     fieldsets = (
@@ -36,16 +41,31 @@ class TagAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ('name',)
 
+class PostImageAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'post', 'caption', 'order')
+    list_select_related = ('post',)
+    search_fields = ('^post__title', 'caption')
+    autocomplete_fields = ('post',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
 class ReactionAdmin(admin.ModelAdmin):
     list_display = ('user', 'post', 'reaction_type', 'created_at')
+    list_select_related = ('user', 'post')
     list_filter = ('reaction_type', 'created_at')
-    search_fields = ('user__username', 'post__title')
-    date_hierarchy = 'created_at'
+    # Narrowed to an exact username and a title prefix. On PostgreSQL these
+    # compile to UPPER(...) = / LIKE, which no index serves, but the scan is
+    # over the users and posts tables; matching reactions are then reached
+    # through their foreign-key indexes rather than by scanning reactions
+    search_fields = ('=user__username', '^post__title')
+    autocomplete_fields = ('user', 'post')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 # Register models
 admin.site.register(Post, PostAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Tag, TagAdmin)
-admin.site.register(PostImage)
+admin.site.register(PostImage, PostImageAdmin)
 admin.site.register(Reaction, ReactionAdmin)
 
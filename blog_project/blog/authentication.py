@@ -0,0 +1,225 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.functional import LazyObject, empty
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .models import RevokedToken
+
+# User attributes copied into tokens so that permission checks need no query
+USER_CLAIMS = ('username', 'is_staff', 'is_superuser')
+
+
+def set_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issues token pairs carrying the claims read by ``TokenClaimsUser``"""
+    @classmethod
+    def get_token(cls, user):
+        return set_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refuses revoked refresh tokens and re-reads user claims on refresh.
+
+    Follows ``TokenRefreshSerializer.validate``, but the user row it loads
+    for the active check also supplies the fresh claims, so the token is
+    decoded and the user fetched once.
+    """
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if revocation_list.is_revoked(refresh.get(jwt_settings.JTI_CLAIM)):
+            raise InvalidToken('Token has been revoked')
+
+        user_model = get_user_model()
+        try:
+            user = user_model.objects.get(
+                **{jwt_settings.USER_ID_FIELD: refresh[jwt_settings.USER_ID_CLAIM]}
+            )
+        except (KeyError, user_model.DoesNotExist):
+            user = None
+        if user is None or not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        # The access token copies the refresh token's claims
+        set_user_claims(refresh, user)
+        data = {'access': str(refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # Blacklist app not installed
+                    pass
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+        return data
+
+
+class RevocationList:
+    """
+    Process-local copy of the revoked token ids.
+
+    The unexpired rows are reloaded at most once every
+    ``JWT_REVOCATION_REFRESH`` seconds, so checking a token costs a set
+    lookup rather than a query. The whole set is read each time: ids are
+    handed out before commit, so a high-water mark on the primary key
+    could skip a row that commits late.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked = {}
+        self._checked_at = 0.0
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked_at < settings.JWT_REVOCATION_REFRESH:
+            return
+        with self._lock:
+            if now - self._checked_at < settings.JWT_REVOCATION_REFRESH:
+                return
+            current = timezone.now()
+            revoked = dict(
+                RevokedToken.objects.filter(expires_at__gt=current).values_list('jti', 'expires_at')
+            )
+            # Entries added here may not be committed yet; revocations only
+            # ever end by expiring, so keep them until then
+            for jti, expires_at in self._revoked.items():
+                if expires_at > current:
+                    revoked.setdefault(jti, expires_at)
+            self._revoked = revoked
+            self._checked_at = now
+
+    def is_revoked(self, jti):
+        self._refresh()
+        return jti in self._revoked
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def clear(self):
+        with self._lock:
+            self._revoked = {}
+            self._checked_at = 0.0
+
+
+revocation_list = RevocationList()
+
+
+class UserCache:
+    """Short-TTL, size-bounded cache of user rows keyed by id"""
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, user_id):
+        ttl = settings.JWT_USER_CACHE_TTL
+        if ttl:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > time.monotonic():
+                # Each request gets its own copy so mutations do not leak
+                return copy.copy(entry[1])
+
+        user = get_user_model().objects.get(**{jwt_settings.USER_ID_FIELD: user_id})
+        if ttl:
+            if len(self._entries) >= settings.JWT_USER_CACHE_SIZE:
+                self._entries.pop(next(iter(self._entries)), None)
+            self._entries[user_id] = (time.monotonic() + ttl, user)
+            user = copy.copy(user)
+        return user
+
+    def clear(self):
+        self._entries = {}
+
+
+user_cache = UserCache()
+
+
+def load_user(user_id):
+    try:
+        user = user_cache.get(user_id)
+    except get_user_model().DoesNotExist:
+        raise AuthenticationFailed('User not found', code='user_not_found')
+    if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+    return user
+
+
+class TokenClaimsUser(LazyObject):
+    """
+    Stands in for the authenticated user using the token claims.
+
+    ``pk``, ``username`` and the staff flags come straight from the token;
+    anything else (including passing it to a ForeignKey) loads the real user
+    through ``user_cache`` on first use.
+    """
+    def __init__(self, token):
+        super().__init__()
+        self.__dict__['_token'] = token
+
+    def _setup(self):
+        self._wrapped = load_user(self._token[jwt_settings.USER_ID_CLAIM])
+
+    def _claim(self, name):
+        if self._wrapped is not empty:
+            return getattr(self._wrapped, name)
+        return self._token.get(name, False)
+
+    @property
+    def pk(self):
+        return self._token[jwt_settings.USER_ID_CLAIM]
+
+    id = pk
+
+    @property
+    def username(self):
+        return self._claim('username')
+
+    @property
+    def is_staff(self):
+        return self._claim('is_staff')
+
+    @property
+    def is_superuser(self):
+        return self._claim('is_superuser')
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __bool__(self):
+        return True
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that validates the signature and claims only: no
+    query per request unless the view needs more of the user than the
+    token carries, and then only once per ``JWT_USER_CACHE_TTL``.
+    """
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if revocation_list.is_revoked(token.get(jwt_settings.JTI_CLAIM)):
+            raise InvalidToken('Token has been revoked')
+        return token
+
+    def get_user(self, validated_token):
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('Token contained no recognizable user identification')
+        return TokenClaimsUser(validated_token)
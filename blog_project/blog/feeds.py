@@ -0,0 +1,304 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Max
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_http_methods
+
+from .models import Post, Category, Tag
+from .versioning import get_version, bump_versions
+
+# Only what feeds and sitemaps print is read from the database
+FEED_FIELDS = ('id', 'slug', 'title', 'excerpt', 'created_at', 'updated_at')
+
+ALL_POSTS_KEY = 'feeds:all'
+SITEMAP_INDEX_KEY = 'sitemap:index'
+
+
+def category_key(slug):
+    return f'feeds:category:{slug}'
+
+
+def tag_key(slug):
+    return f'feeds:tag:{slug}'
+
+
+def shard_key(shard):
+    return f'sitemap:{shard}'
+
+
+def shard_of(post_id):
+    return post_id // settings.SITEMAP_SHARD_SIZE
+
+
+def invalidate(post_ids=(), category_ids=(), tag_ids=(), category_slugs=(), tag_slugs=()):
+    """
+    Mark the feeds and sitemap shards showing these posts, categories or
+    tags as stale once the current transaction commits. Everything else
+    stays cached.
+
+    Categories and tags are given by id, or by slug when the row is gone
+    or its slug has changed.
+    """
+    keys = []
+    post_ids = list(post_ids)
+    if post_ids:
+        keys += [ALL_POSTS_KEY, SITEMAP_INDEX_KEY]
+        keys += [shard_key(shard) for shard in {shard_of(pk) for pk in post_ids}]
+    category_slugs = set(category_slugs)
+    if category_ids:
+        category_slugs.update(
+            Category.objects.filter(pk__in=category_ids).values_list('slug', flat=True)
+        )
+    tag_slugs = set(tag_slugs)
+    if tag_ids:
+        tag_slugs.update(Tag.objects.filter(pk__in=tag_ids).values_list('slug', flat=True))
+    keys += [category_key(slug) for slug in category_slugs]
+    keys += [tag_key(slug) for slug in tag_slugs]
+    transaction.on_commit(lambda: bump_versions(keys))
+
+
+def site_origin(request):
+    """
+    Scheme and host that absolute URLs in feeds and sitemaps are built
+    from: SITE_URL when set, otherwise the request's validated host
+    """
+    if settings.SITE_URL:
+        return settings.SITE_URL.rstrip('/')
+    return f'{request.scheme}://{request.get_host()}'
+
+
+def cached_by_version(key_func, kind):
+    """
+    Cache a view's rendered output under the current version of the key
+    returned by ``key_func(**kwargs)``, and answer conditional GETs with
+    the stored ETag / Last-Modified without touching the database.
+
+    Output contains absolute URLs, so it is only cached when SITE_URL is
+    set; otherwise every Host a client sends would get its own entry and
+    its own full render, and the view runs on each request instead.
+    """
+    def decorator(view):
+        def render(request, **kwargs):
+            response = view(request, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            if response.status_code != 200:
+                return response, None
+            content = response.content
+            return response, {
+                'content': content,
+                'content_type': response['Content-Type'],
+                'etag': f'"{hashlib.md5(content).hexdigest()}"',
+                'last_modified': parse_http_date_safe(response.get('Last-Modified', '')),
+            }
+
+        @wraps(view)
+        @require_http_methods(['GET', 'HEAD'])
+        def wrapper(request, **kwargs):
+            if settings.SITE_URL:
+                key = key_func(**kwargs)
+                cache_key = f'{key}:{kind}:{get_version(key)}'
+                entry = cache.get(cache_key)
+                if entry is None:
+                    response, entry = render(request, **kwargs)
+                    if entry is None:
+                        return response
+                    cache.set(cache_key, entry, settings.FEED_CACHE_TIMEOUT)
+            else:
+                response, entry = render(request, **kwargs)
+                if entry is None:
+                    return response
+
+            response = get_conditional_response(
+                request, etag=entry['etag'], last_modified=entry['last_modified']
+            )
+            if response is None:
+                response = HttpResponse(entry['content'], content_type=entry['content_type'])
+            response['ETag'] = entry['etag']
+            if entry['last_modified']:
+                response['Last-Modified'] = http_date(entry['last_modified'])
+            patch_cache_control(response, public=True, max_age=settings.FEED_MAX_AGE)
+            return response
+        return wrapper
+    return decorator
+
+
+class LatestPostsFeed(Feed):
+    title = "Abdulaziz's Blog"
+    description = 'Latest posts'
+    # Set per request by _feed_view. Every URL is made absolute from
+    # ``origin`` so the syndication framework never adds the Host header.
+    origin = ''
+    path = ''
+
+    def absolute(self, path):
+        return f'{self.origin}{path}'
+
+    def link(self, obj=None):
+        return self.absolute(reverse('post-list'))
+
+    def feed_url(self, obj=None):
+        return self.absolute(self.path)
+
+    def item_link(self, item):
+        return self.absolute(item.get_absolute_url())
+
+    def posts(self, obj):
+        return Post.objects.filter(published=True)
+
+    def items(self, obj=None):
+        return self.posts(obj).only(*FEED_FIELDS)[:settings.FEED_SIZE]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Category.objects.only('name', 'slug'), slug=slug)
+
+    def title(self, obj):
+        return f"{LatestPostsFeed.title}: {obj.name}"
+
+    def description(self, obj):
+        return f'Latest posts in {obj.name}'
+
+    def link(self, obj):
+        return self.absolute(f"{reverse('post-list')}?categories__slug={obj.slug}")
+
+    def posts(self, obj):
+        return super().posts(obj).filter(categories=obj)
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class TagPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Tag.objects.only('name', 'slug'), slug=slug)
+
+    def title(self, obj):
+        return f"{LatestPostsFeed.title}: #{obj.name}"
+
+    def description(self, obj):
+        return f'Latest posts tagged {obj.name}'
+
+    def link(self, obj):
+        return self.absolute(f"{reverse('post-list')}?tags__slug={obj.slug}")
+
+    def posts(self, obj):
+        return super().posts(obj).filter(tags=obj)
+
+
+class TagPostsAtomFeed(TagPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+def _feed_view(feed_class, key_func, kind):
+    def view(request, **kwargs):
+        feed = feed_class()
+        feed.origin = site_origin(request)
+        feed.path = request.path
+        return feed(request, **kwargs)
+    return cached_by_version(key_func, kind)(view)
+
+
+latest_rss = _feed_view(LatestPostsFeed, lambda: ALL_POSTS_KEY, 'rss')
+latest_atom = _feed_view(LatestPostsAtomFeed, lambda: ALL_POSTS_KEY, 'atom')
+category_rss = _feed_view(CategoryPostsFeed, category_key, 'rss')
+category_atom = _feed_view(CategoryPostsAtomFeed, category_key, 'atom')
+tag_rss = _feed_view(TagPostsFeed, tag_key, 'rss')
+tag_atom = _feed_view(TagPostsAtomFeed, tag_key, 'atom')
+
+
+class SitemapEntry:
+    def __init__(self, location, last_mod):
+        self.location = location
+        self.last_mod = last_mod
+
+
+def _latest(values):
+    values = [value for value in values if value]
+    return max(values) if values else None
+
+
+def _last_modified(response, latest):
+    if latest:
+        response['Last-Modified'] = http_date(latest.timestamp())
+    return response
+
+
+@cached_by_version(lambda: SITEMAP_INDEX_KEY, 'xml')
+def sitemap_index(request):
+    """
+    Sitemap index with one entry per shard of SITEMAP_SHARD_SIZE post ids,
+    built from a single grouped query
+    """
+    shards = (
+        Post.objects.filter(published=True)
+        .annotate(shard=F('id') / settings.SITEMAP_SHARD_SIZE)
+        .values('shard')
+        .annotate(last_mod=Max('updated_at'))
+        .order_by('shard')
+    )
+    sitemaps = [
+        SitemapEntry(
+            site_origin(request) + reverse('sitemap-shard', kwargs={'shard': row['shard']}),
+            row['last_mod'],
+        )
+        for row in shards
+    ]
+    response = render(
+        request, 'sitemap_index.xml', {'sitemaps': sitemaps}, content_type='application/xml'
+    )
+    return _last_modified(response, _latest(entry.last_mod for entry in sitemaps))
+
+
+@cached_by_version(shard_key, 'xml')
+def sitemap_shard(request, shard):
+    size = settings.SITEMAP_SHARD_SIZE
+    rows = list(
+        Post.objects.filter(published=True, id__gte=shard * size, id__lt=(shard + 1) * size)
+        .order_by('id')
+        .values_list('slug', 'updated_at')
+    )
+    if not rows:
+        raise Http404('No such sitemap')
+
+    base = site_origin(request) + reverse('post-list')
+    urlset = [{'location': f'{base}{slug}/', 'lastmod': updated_at} for slug, updated_at in rows]
+    response = render(
+        request, 'sitemap.xml', {'urlset': urlset}, content_type='application/xml'
+    )
+    return _last_modified(response, _latest(updated_at for _, updated_at in rows))
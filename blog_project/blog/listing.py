@@ -0,0 +1,112 @@
+from collections import defaultdict
+
+from django.db.models import Count
+from rest_framework import serializers
+
+from . import taxonomy_cache
+from .models import Post, Reaction
+from .taxonomy import TAXONOMY_FIELDS
+
+# Read-only fast path for list endpoints: rows are built from .values()
+# querysets into plain dicts with the same keys, order and representation
+# as PostListSerializer / CategorySerializer / TagSerializer.
+
+POST_LIST_VALUES = (
+    'id', 'title', 'slug', 'excerpt', 'author__username', 'featured_image',
+    'created_at', 'updated_at', 'published',
+)
+
+TAXONOMY_VALUES = ('id', 'name', 'slug')
+
+# Through-table lookup of the taxonomy name, per Post M2M field
+TAXONOMY_NAME_LOOKUPS = {
+    'categories': 'category__name',
+    'tags': 'tag__name',
+}
+
+_datetime_field = serializers.DateTimeField()
+
+
+def names_by_post(field, post_ids):
+    """Map post id to its category or tag names, in the order they were added"""
+    through = getattr(Post, field).through
+    _, column = TAXONOMY_FIELDS[field]
+    by_id = taxonomy_cache.CACHES_BY_FIELD[field].by_id()
+    if by_id is None:
+        return _names_by_post_from_db(field, post_ids)
+
+    names = defaultdict(list)
+    rows = through.objects.filter(post_id__in=post_ids).order_by('pk').values_list('post_id', column)
+    for post_id, object_id in rows:
+        if object_id not in by_id:
+            # Created elsewhere since this worker last refreshed its copy
+            return _names_by_post_from_db(field, post_ids)
+        names[post_id].append(by_id[object_id]['name'])
+    return names
+
+
+def _names_by_post_from_db(field, post_ids):
+    through = getattr(Post, field).through
+    names = defaultdict(list)
+    rows = through.objects.filter(post_id__in=post_ids).order_by('pk').values_list(
+        'post_id', TAXONOMY_NAME_LOOKUPS[field]
+    )
+    for post_id, name in rows:
+        names[post_id].append(name)
+    return names
+
+
+def _reaction_counts(post_ids):
+    counts = defaultdict(int)
+    rows = Reaction.objects.filter(post_id__in=post_ids).order_by().values_list(
+        'post_id', 'reaction_type'
+    ).annotate(total=Count('id'))
+    for post_id, reaction_type, total in rows:
+        counts[post_id, reaction_type] = total
+    return counts
+
+
+def post_list_rows(rows, request=None):
+    """
+    Turn ``Post`` rows fetched with ``.values(*POST_LIST_VALUES)`` into
+    PostListSerializer output, using one query each for categories, tags
+    and reaction counts instead of several per post. Category and tag
+    names come from the taxonomy cache.
+    """
+    rows = list(rows)
+    post_ids = [row['id'] for row in rows]
+    if not post_ids:
+        return []
+
+    categories = names_by_post('categories', post_ids)
+    tags = names_by_post('tags', post_ids)
+    reactions = _reaction_counts(post_ids)
+    storage = Post._meta.get_field('featured_image').storage
+    to_datetime = _datetime_field.to_representation
+
+    results = []
+    for row in rows:
+        post_id = row['id']
+        image = row['featured_image']
+        if image:
+            image = storage.url(image)
+            if request is not None:
+                image = request.build_absolute_uri(image)
+        else:
+            image = None
+        results.append({
+            'id': post_id,
+            'title': row['title'],
+            'slug': row['slug'],
+            'excerpt': row['excerpt'],
+            'author': row['author__username'],
+            'featured_image': image,
+            'categories': categories.get(post_id, []),
+            'tags': tags.get(post_id, []),
+            'created_at': to_datetime(row['created_at']),
+            'updated_at': to_datetime(row['updated_at']),
+            'published': row['published'],
+            'likes_count': reactions[post_id, Reaction.LIKE],
+            'dislikes_count': reactions[post_id, Reaction.DISLIKE],
+        })
+    return results
@@ -0,0 +1,88 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from blog.listing import post_list_rows, POST_LIST_VALUES
+from blog.models import Post, Category, Tag, Reaction
+from blog.renderers import FastJSONRenderer
+from blog.serializers import PostListSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare rendering a page of posts with PostListSerializer against '
+        'the .values() fast path. Sample rows are created in a transaction '
+        'that is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100, help='Posts per page')
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['posts'], options['iterations'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_sample(self, count):
+        author = User.objects.create_user('bench-author')
+        readers = [User.objects.create_user(f'bench-reader-{i}') for i in range(5)]
+        categories = [Category.objects.create(name=f'Bench category {i}') for i in range(3)]
+        tags = [Tag.objects.create(name=f'Bench tag {i}') for i in range(5)]
+        posts = []
+        for i in range(count):
+            post = Post.objects.create(
+                title=f'Benchmark post {i}', content='Body ' * 50, author=author, published=True
+            )
+            post.categories.add(*categories[:1 + i % 3])
+            post.tags.add(*tags[:1 + i % 5])
+            Reaction.objects.bulk_create([
+                Reaction(post=post, user=reader,
+                         reaction_type=Reaction.LIKE if j % 2 else Reaction.DISLIKE)
+                for j, reader in enumerate(readers)
+            ])
+            posts.append(post.pk)
+        return posts
+
+    def measure(self, label, render, iterations):
+        with CaptureQueriesContext(connection) as queries:
+            body = render()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            render()
+        elapsed = (time.perf_counter() - start) / iterations
+        self.stdout.write(
+            f'{label:<12} {elapsed * 1000:8.2f} ms/page  {len(queries):4d} queries  {len(body)} bytes'
+        )
+        return elapsed, body
+
+    def run(self, count, iterations):
+        post_ids = self.create_sample(count)
+        request = RequestFactory().get('/api/posts/')
+        queryset = Post.objects.filter(pk__in=post_ids)
+
+        def serializer_path():
+            data = PostListSerializer(queryset, many=True, context={'request': request}).data
+            return JSONRenderer().render(data)
+
+        def fast_path():
+            rows = post_list_rows(queryset.values(*POST_LIST_VALUES), request)
+            return FastJSONRenderer().render(rows)
+
+        slow, expected = self.measure('serializer', serializer_path, iterations)
+        fast, body = self.measure('fast path', fast_path, iterations)
+        self.stdout.write(f'speedup      {slow / fast:8.1f}x')
+        if body != expected:
+            self.stderr.write('Output differs from PostListSerializer')
@@ -0,0 +1,78 @@
+import os
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter so that nothing is imported yet
+STARTUP_SCRIPT = '''
+import importlib
+module, attr = {wsgi!r}.rsplit('.', 1)
+application = getattr(importlib.import_module(module), attr)
+from django.urls import get_resolver
+get_resolver().url_patterns
+'''
+
+
+def parse_importtime(output):
+    """Yield ``(module, self_us, cumulative_us)`` from ``-X importtime`` output"""
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        yield fields[2].strip(), int(fields[0]), int(fields[1])
+
+
+class Command(BaseCommand):
+    help = (
+        'Start the WSGI application and URLconf in a fresh interpreter and '
+        'report import time per module, plus total time and peak memory.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help='Rows to show')
+        parser.add_argument(
+            '--by-package', action='store_true',
+            help='Sum self time per top-level package instead of listing modules',
+        )
+
+    def handle(self, *args, **options):
+        script = STARTUP_SCRIPT.format(wsgi=settings.WSGI_APPLICATION)
+        env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+        )
+        elapsed = time.perf_counter() - start
+        if result.returncode:
+            self.stderr.write(result.stderr)
+            return
+
+        rows = list(parse_importtime(result.stderr))
+        if options['by_package']:
+            totals = defaultdict(int)
+            for module, self_us, _ in rows:
+                totals[module.strip().split('.')[0]] += self_us
+            ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+            self.stdout.write(f"{'self ms':>9}  package")
+            for package, self_us in ranked[:options['limit']]:
+                self.stdout.write(f'{self_us / 1000:9.1f}  {package}')
+        else:
+            ranked = sorted(rows, key=lambda row: row[2], reverse=True)
+            self.stdout.write(f"{'cumul ms':>9} {'self ms':>9}  module")
+            for module, self_us, cumulative_us in ranked[:options['limit']]:
+                self.stdout.write(f'{cumulative_us / 1000:9.1f} {self_us / 1000:9.1f}  {module}')
+
+        peak_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        self.stdout.write(
+            f'\n{len(rows)} modules imported, {sum(row[1] for row in rows) / 1000:.1f} ms '
+            f'import time, {elapsed * 1000:.0f} ms wall, {peak_kb / 1024:.1f} MiB peak RSS'
+        )
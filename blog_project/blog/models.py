@@ -1,9 +1,11 @@
 import uuid
+from functools import partial
 from django.db import models
 from django.contrib.auth.models import User
-from django.utils.text import slugify
-import markdown
+from django.urls import reverse
 from django.utils.html import mark_safe
+from .rendering import render_markdown
+from .slugs import save_with_unique_slug
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -16,9 +18,7 @@ class Category(models.Model):
         return self.name
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        save_with_unique_slug(self, self.name, partial(super().save, *args, **kwargs))
 
 class Tag(models.Model):
     name = models.CharField(max_length=50)
@@ -28,9 +28,7 @@ class Tag(models.Model):
         return self.name
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        save_with_unique_slug(self, self.name, partial(super().save, *args, **kwargs))
 
 def post_image_upload_path(instance, filename):
     # Generate a unique path for each uploaded image
@@ -45,7 +43,7 @@ class Post(models.Model):
     featured_image = models.ImageField(upload_to=post_image_upload_path, blank=True, null=True)
     categories = models.ManyToManyField(Category, blank=True, related_name='posts')
     tags = models.ManyToManyField(Tag, blank=True, related_name='posts')
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     published = models.BooleanField(default=False)
     
@@ -55,24 +53,20 @@ class Post(models.Model):
     def __str__(self):
         return self.title
     
+    def get_absolute_url(self):
+        return reverse('post-detail', kwargs={'slug': self.slug})
+    
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
         if not self.excerpt and self.content:
             # Create an excerpt from the first 150 characters of content
             plain_content = self.content.replace('#', '').replace('*', '')
             self.excerpt = plain_content[:150] + '...' if len(plain_content) > 150 else plain_content
-        super().save(*args, **kwargs)
+        save_with_unique_slug(self, self.title, partial(super().save, *args, **kwargs))
     
     @property
     def rendered_content(self):
         """Convert markdown content to HTML"""
-        return mark_safe(markdown.markdown(
-            self.content,
-            extensions=['markdown.extensions.fenced_code', 
-                        'markdown.extensions.tables',
-                        'markdown.extensions.nl2br']
-        ))
+        return mark_safe(render_markdown(self.content))
     
     @property
     def likes_count(self):
@@ -110,7 +104,7 @@ class Reaction(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='reactions')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     reaction_type = models.CharField(max_length=10, choices=REACTION_CHOICES)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     
     class Meta:
         unique_together = ['post', 'user']
@@ -119,3 +113,12 @@ class Reaction(models.Model):
     def __str__(self):
         return f"{self.user.username} {self.reaction_type}d {self.post.title}"
 
+
+class RevokedToken(models.Model):
+    """JWT ids that must no longer be accepted, kept until the token expires"""
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.jti
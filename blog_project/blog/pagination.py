@@ -1,3 +1,6 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from rest_framework.pagination import PageNumberPagination
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -5,3 +8,29 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists over large tables. Unfiltered querysets
+    on PostgreSQL use the planner's row estimate instead of COUNT(*), which
+    has to scan the whole table; small tables and filtered querysets are
+    still counted exactly.
+    """
+    exact_count_threshold = 10000
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where and not query.distinct:
+            connection = connections[queryset.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+                        [connection.ops.quote_name(queryset.model._meta.db_table)]
+                    )
+                    row = cursor.fetchone()
+                if row and row[0] > self.exact_count_threshold:
+                    return row[0]
+        return super().count
@@ -0,0 +1,30 @@
+import threading
+
+MARKDOWN_EXTENSIONS = [
+    'markdown.extensions.fenced_code',
+    'markdown.extensions.tables',
+    'markdown.extensions.nl2br',
+]
+
+_local = threading.local()
+
+
+def get_markdown():
+    """
+    The Markdown converter for the current thread, built (and the markdown
+    package imported) on first use. Markdown instances keep per-document
+    state, so they are reused within a thread but never shared across threads.
+    """
+    md = getattr(_local, 'markdown', None)
+    if md is None:
+        import markdown
+        md = _local.markdown = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    return md
+
+
+def render_markdown(text):
+    md = get_markdown()
+    try:
+        return md.convert(text)
+    finally:
+        md.reset()
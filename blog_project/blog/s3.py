@@ -0,0 +1,10 @@
+from storages.backends.s3 import S3Storage
+
+from .storage import ContentAddressedMixin
+
+
+class ContentAddressedS3Storage(ContentAddressedMixin, S3Storage):
+    """
+    S3-compatible media storage with upload deduplication. Point
+    ``endpoint_url`` at a local stand-in (e.g. MinIO) for development.
+    """
@@ -1,5 +1,8 @@
+from django.db import models, transaction
 from rest_framework import serializers
 from .models import Post, Category, Tag, PostImage, Reaction
+from .listing import names_by_post
+from .taxonomy import resolve_names
 from django.contrib.auth.models import User
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -83,16 +86,52 @@ class PostDetailSerializer(PostSerializer):
     class Meta(PostSerializer.Meta):
         fields = PostSerializer.Meta.fields + ['reactions']
 
+class TaxonomyNamesField(serializers.Field):
+    """
+    Read-only list of a post's category or tag names, like
+    ``StringRelatedField(many=True)`` but resolving names through the
+    taxonomy cache. Under ``TaxonomyNamesListSerializer`` the through
+    table is read once for the whole page.
+    """
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, post):
+        batched = getattr(self.parent, '_taxonomy_names', None)
+        if batched is not None:
+            return batched[self.field_name].get(post.pk, [])
+        if self.field_name in getattr(post, '_prefetched_objects_cache', {}):
+            return [str(obj) for obj in getattr(post, self.field_name).all()]
+        return names_by_post(self.field_name, [post.pk]).get(post.pk, [])
+
+class TaxonomyNamesListSerializer(serializers.ListSerializer):
+    """Looks up the child's ``TaxonomyNamesField`` values for all posts at once"""
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        post_ids = [post.pk for post in posts]
+        self.child._taxonomy_names = {
+            name: names_by_post(name, post_ids) if post_ids else {}
+            for name, field in self.child.fields.items()
+            if isinstance(field, TaxonomyNamesField)
+        }
+        try:
+            return super().to_representation(posts)
+        finally:
+            del self.child._taxonomy_names
+
 class PostListSerializer(serializers.ModelSerializer):
     """Simplified serializer for list views"""
     author = serializers.ReadOnlyField(source='author.username')
-    categories = serializers.StringRelatedField(many=True)
-    tags = serializers.StringRelatedField(many=True)
+    categories = TaxonomyNamesField()
+    tags = TaxonomyNamesField()
     likes_count = serializers.ReadOnlyField()
     dislikes_count = serializers.ReadOnlyField()
     
     class Meta:
         model = Post
+        list_serializer_class = TaxonomyNamesListSerializer
         fields = [
             'id', 'title', 'slug', 'excerpt', 'author', 
             'featured_image', 'categories', 'tags',
@@ -116,11 +155,80 @@ class PostCreateSerializer(serializers.ModelSerializer):
         source='tags',
         required=False
     )
+    category_names = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        write_only=True,
+        required=False
+    )
+    tag_names = serializers.ListField(
+        child=serializers.CharField(max_length=50),
+        write_only=True,
+        required=False
+    )
     
     class Meta:
         model = Post
         fields = [
             'title', 'content', 'excerpt', 'featured_image',
-            'category_ids', 'tag_ids', 'published'
+            'category_ids', 'tag_ids', 'category_names', 'tag_names', 'published'
         ]
+    
+    def create(self, validated_data):
+        # Names are resolved (and missing ones created) in one batch each
+        category_names = validated_data.pop('category_names', None)
+        tag_names = validated_data.pop('tag_names', None)
+        with transaction.atomic():
+            post = super().create(validated_data)
+            if category_names:
+                post.categories.add(*resolve_names(Category, category_names))
+            if tag_names:
+                post.tags.add(*resolve_names(Tag, tag_names))
+        return post
+
+class TaxonomyNamesSerializer(serializers.Serializer):
+    """Input for resolving category/tag names, creating missing ones"""
+    names = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        allow_empty=False,
+        max_length=1000
+    )
+    
+    def validate_names(self, value):
+        model = self.context['model']
+        max_length = model._meta.get_field('name').max_length
+        too_long = [name for name in value if len(name.strip()) > max_length]
+        if too_long:
+            raise serializers.ValidationError(
+                f'Names must be at most {max_length} characters: {too_long}'
+            )
+        return value
+
+class BulkTaxonomySerializer(serializers.Serializer):
+    """Input for assigning categories/tags to many posts at once"""
+    MODE_CHOICES = ['add', 'replace', 'remove']
+    
+    posts = serializers.ListField(
+        child=serializers.SlugField(max_length=250),
+        allow_empty=False
+    )
+    category_names = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        required=False
+    )
+    tag_names = serializers.ListField(
+        child=serializers.CharField(max_length=50),
+        required=False
+    )
+    mode = serializers.ChoiceField(choices=MODE_CHOICES, default='add')
+    
+    def validate(self, attrs):
+        if 'category_names' not in attrs and 'tag_names' not in attrs:
+            raise serializers.ValidationError(
+                'Provide category_names and/or tag_names.'
+            )
+        return attrs
+
 
+class TokenRevokeSerializer(serializers.Serializer):
+    """Input for revoking JWTs; the presented access token is always revoked"""
+    refresh = serializers.CharField(required=False)
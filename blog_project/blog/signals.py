@@ -0,0 +1,93 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .feeds import invalidate
+from .models import Post, Category, Tag
+from .taxonomy_cache import invalidate_taxonomy
+
+
+def _taxonomy_ids(post):
+    return (
+        list(post.categories.values_list('pk', flat=True)),
+        list(post.tags.values_list('pk', flat=True)),
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    category_ids, tag_ids = _taxonomy_ids(instance)
+    invalidate([instance.pk], category_ids, tag_ids)
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    # The M2M rows are gone once the post is deleted, so look them up now
+    instance._feed_taxonomy_ids = _taxonomy_ids(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    category_ids, tag_ids = getattr(instance, '_feed_taxonomy_ids', ((), ()))
+    invalidate([instance.pk], category_ids, tag_ids)
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Tag)
+def taxonomy_saving(sender, instance, **kwargs):
+    # Feeds are cached by slug, so a renamed slug must expire the old one too
+    instance._feed_old_slug = None
+    if instance.pk is not None:
+        instance._feed_old_slug = (
+            sender.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+        )
+
+
+def _taxonomy_slugs(instance):
+    # By slug rather than id: on delete the row is already gone
+    return {instance.slug, getattr(instance, '_feed_old_slug', None)} - {None, ''}
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    invalidate_taxonomy(Category)
+    invalidate(category_slugs=_taxonomy_slugs(instance))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    invalidate_taxonomy(Tag)
+    invalidate(tag_slugs=_taxonomy_slugs(instance))
+
+
+def _post_taxonomy_changed(field, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # Remember what is about to be cleared; pk_set is None for clears
+        if reverse:
+            instance._feed_cleared_ids = list(getattr(instance, 'posts').values_list('pk', flat=True))
+        else:
+            instance._feed_cleared_ids = list(getattr(instance, field).values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    ids = list(pk_set or ()) if action != 'post_clear' else getattr(instance, '_feed_cleared_ids', [])
+    if reverse:
+        post_ids, taxonomy_ids = ids, [instance.pk]
+    else:
+        post_ids, taxonomy_ids = [instance.pk], ids
+    if field == 'categories':
+        invalidate(post_ids, category_ids=taxonomy_ids)
+    else:
+        invalidate(post_ids, tag_ids=taxonomy_ids)
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def post_categories_changed(sender, **kwargs):
+    _post_taxonomy_changed('categories', **kwargs)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed(sender, **kwargs):
+    _post_taxonomy_changed('tags', **kwargs)
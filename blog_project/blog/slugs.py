@@ -0,0 +1,124 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Characters kept free at the end of long slugs for a "-<n>" suffix
+SUFFIX_ROOM = 8
+
+
+def slug_base(model, value, field='slug'):
+    """The un-suffixed slug for ``value``, truncated to the field's max_length"""
+    max_length = model._meta.get_field(field).max_length
+    base = slugify(value)[:max_length].strip('-')
+    return base or model._meta.model_name
+
+
+def _with_suffix(base, counter, max_length):
+    suffix = f'-{counter}'
+    return base[:max_length - len(suffix)].rstrip('-') + suffix
+
+
+def _candidates_lookup(base, field, max_length):
+    # Only the base itself and "<base>-<n>" can collide. The startswith
+    # half is served by the slug index, the regex drops unrelated slugs
+    # such as "<base>-and-more" before they are sent back. Long bases get
+    # truncated before the suffix, so match on the part that always
+    # survives instead.
+    if len(base) > max_length - SUFFIX_ROOM:
+        prefix = base[:max_length - SUFFIX_ROOM]
+        pattern = rf'^{re.escape(prefix)}.*-[0-9]+$'
+    else:
+        prefix = f'{base}-'
+        pattern = rf'^{re.escape(prefix)}[0-9]+$'
+    return Q(**{field: base}) | Q(**{f'{field}__startswith': prefix, f'{field}__regex': pattern})
+
+
+def allocate_slugs(model, values, field='slug', reserved=()):
+    """
+    Return a unique slug for each of ``values``.
+
+    Existing slugs equal to one of the candidates or extending it with a
+    numeric suffix are read with a single query; suffixes are then handed
+    out in memory, lowest free one first. A gap is filled rather than
+    continuing from the highest suffix, since "hello-world-2020" may just
+    as well be the slug of a title ending in a number. Slugs in
+    ``reserved`` are treated as taken as well.
+    """
+    values = list(values)
+    if not values:
+        return []
+
+    max_length = model._meta.get_field(field).max_length
+    bases = [slug_base(model, value, field) for value in values]
+    lookup = reduce(or_, (_candidates_lookup(base, field, max_length) for base in set(bases)))
+    taken = set(model._default_manager.filter(lookup).order_by().values_list(field, flat=True))
+    taken.update(reserved)
+
+    counters = {}
+    slugs = []
+    for base in bases:
+        counter = counters.get(base, 1)
+        slug = base if counter == 1 else _with_suffix(base, counter, max_length)
+        while slug in taken:
+            counter += 1
+            slug = _with_suffix(base, counter, max_length)
+        counters[base] = counter
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def save_with_unique_slug(instance, value, save, attempts=3):
+    """
+    Fill ``instance.slug`` from ``value`` when blank and run ``save``.
+
+    A concurrent create may grab the same slug between allocation and
+    insert; the insert then fails on the unique index inside a savepoint
+    and a fresh slug is allocated.
+    """
+    if instance.slug:
+        return save()
+
+    for attempt in range(attempts):
+        instance.slug = allocate_slugs(type(instance), [value])[0]
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            instance.slug = ''
+            if attempt == attempts - 1:
+                raise
+
+
+def bulk_create_with_slugs(model, objs, source, batch_size=1000, attempts=3):
+    """
+    ``bulk_create`` for imports: objects without a slug get one allocated
+    from their ``source`` attribute, in batches, retrying a batch with new
+    slugs if a concurrent insert took one of them. Like ``bulk_create`` it
+    sends no signals, so call ``blog.taxonomy_cache.invalidate_taxonomy``
+    after importing categories or tags.
+    """
+    objs = list(objs)
+    created = []
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        pending = [obj for obj in batch if not obj.slug]
+        fixed = {obj.slug for obj in batch if obj.slug}
+        for attempt in range(attempts):
+            slugs = allocate_slugs(
+                model, [getattr(obj, source) for obj in pending], reserved=fixed
+            )
+            for obj, slug in zip(pending, slugs):
+                obj.slug = slug
+            try:
+                with transaction.atomic():
+                    created.extend(model._default_manager.bulk_create(batch))
+                break
+            except IntegrityError:
+                if attempt == attempts - 1:
+                    raise
+    return created
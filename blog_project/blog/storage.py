@@ -0,0 +1,43 @@
+import hashlib
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedMixin:
+    """
+    Stores uploads under the SHA-256 of their content, so identical files
+    uploaded to different posts share one stored object. The name produced
+    by ``upload_to`` only contributes its extension.
+
+    Two identical uploads racing each other may still both be written; the
+    loser then ends up with a regular, suffixed copy.
+    """
+    def __init__(self, *args, deduplicate=True, content_prefix='blog/cas', **kwargs):
+        self.deduplicate = deduplicate
+        self.content_prefix = content_prefix
+        super().__init__(*args, **kwargs)
+
+    def content_name(self, name, digest):
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(self.content_prefix, digest[:2], digest[2:4], digest + extension)
+
+    def _digest(self, content):
+        sha = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            sha.update(chunk)
+        content.seek(0)
+        return sha.hexdigest()
+
+    def _save(self, name, content):
+        if not self.deduplicate:
+            return super()._save(name, content)
+        name = self.content_name(name, self._digest(content))
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+class ContentAddressedFileSystemStorage(ContentAddressedMixin, FileSystemStorage):
+    """Local media storage with upload deduplication"""
@@ -0,0 +1,124 @@
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .feeds import invalidate
+from .models import Post, Category, Tag
+from .slugs import allocate_slugs
+from .taxonomy_cache import invalidate_taxonomy
+
+# Through-table column pointing at the taxonomy model, per Post M2M field
+TAXONOMY_FIELDS = {
+    'categories': (Category, 'category_id'),
+    'tags': (Tag, 'tag_id'),
+}
+
+BULK_BATCH_SIZE = 1000
+
+
+def normalize_names(names):
+    """
+    Strip whitespace and drop blank or repeated names, keeping the given
+    order. Names differing only in case count as repeats; the first
+    spelling wins.
+    """
+    seen = {}
+    for name in names:
+        name = (name or '').strip()
+        if name and name.lower() not in seen:
+            seen[name.lower()] = name
+    return list(seen.values())
+
+
+def _existing_by_name(model, names):
+    # Matched case-insensitively so "python" finds an existing "Python";
+    # of rows differing only in case the oldest is used
+    found = {}
+    rows = model.objects.annotate(name_lower=Lower('name')).filter(
+        name_lower__in=[name.lower() for name in names]
+    ).order_by('pk')
+    for obj in rows:
+        found.setdefault(obj.name.lower(), obj)
+    return found
+
+
+def resolve_names(model, names, create=True, max_attempts=3):
+    """
+    Return the Category/Tag instances matching ``names`` (ignoring case) in
+    the given order, creating the missing ones with a single batched insert.
+
+    Rows that lose a slug race against a concurrent insert are silently
+    skipped by ``ignore_conflicts`` and retried with freshly allocated slugs.
+    """
+    names = normalize_names(names)
+    if not names:
+        return []
+
+    found = _existing_by_name(model, names)
+    if create:
+        for _ in range(max_attempts):
+            missing = [name for name in names if name.lower() not in found]
+            if not missing:
+                break
+            slugs = allocate_slugs(model, missing)
+            model.objects.bulk_create(
+                [model(name=name, slug=slug) for name, slug in zip(missing, slugs)],
+                batch_size=BULK_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            found.update(_existing_by_name(model, missing))
+            # bulk_create sends no post_save signals
+            invalidate_taxonomy(model)
+        else:
+            if any(name.lower() not in found for name in names):
+                raise IntegrityError(f'Could not allocate unique slugs for {model.__name__} names')
+
+    return [found[name.lower()] for name in names if name.lower() in found]
+
+
+def assign_taxonomy(post_ids, categories=None, tags=None, mode='add'):
+    """
+    Add, replace or remove categories/tags on many posts at once.
+
+    ``categories``/``tags`` left as ``None`` are not touched. Work is done
+    directly on the M2M through tables, so the cost is a handful of queries
+    regardless of how many posts are affected.
+    """
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+
+    # Taxonomy rows whose feeds show a different set of posts afterwards
+    affected = {'categories': set(), 'tags': set()}
+    with transaction.atomic():
+        for field, objs in (('categories', categories), ('tags', tags)):
+            if objs is None:
+                continue
+            through = getattr(Post, field).through
+            _, column = TAXONOMY_FIELDS[field]
+            object_ids = [obj.pk for obj in objs]
+            affected[field].update(object_ids)
+
+            if mode == 'remove':
+                through.objects.filter(
+                    post_id__in=post_ids, **{f'{column}__in': object_ids}
+                ).delete()
+                continue
+
+            if mode == 'replace':
+                current = through.objects.filter(post_id__in=post_ids)
+                affected[field].update(current.values_list(column, flat=True).distinct())
+                current.delete()
+            through.objects.bulk_create(
+                [
+                    through(post_id=post_id, **{column: object_id})
+                    for post_id in post_ids
+                    for object_id in object_ids
+                ],
+                batch_size=BULK_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+
+        Post.objects.filter(pk__in=post_ids).update(updated_at=timezone.now())
+        # The through tables were edited directly, so no m2m_changed signal
+        invalidate(post_ids, affected['categories'], affected['tags'])
@@ -0,0 +1,111 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Category, Tag
+from .versioning import get_version, bump_versions
+
+
+class TaxonomyCache:
+    """
+    Process-local copy of a whole Category or Tag table with id and slug
+    lookups.
+
+    The copy is stamped with a version counter kept in the shared cache and
+    bumped whenever a row is saved or deleted. The counter is read at most
+    once every TAXONOMY_CACHE_CHECK_INTERVAL seconds, so a stale copy lives
+    at most that long in other workers. Tables larger than
+    TAXONOMY_CACHE_MAX_ROWS are not cached at all: every accessor then
+    returns None and callers fall back to the database.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f'taxonomy:{model._meta.model_name}'
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.version_checks = 0
+
+    def _load(self, version):
+        limit = settings.TAXONOMY_CACHE_MAX_ROWS
+        rows = list(self.model.objects.order_by('pk').values('id', 'name', 'slug')[:limit + 1])
+        if len(rows) > limit:
+            return {'version': version, 'rows': None, 'by_id': None, 'by_slug': None}
+        return {
+            'version': version,
+            'rows': rows,
+            'by_id': {row['id']: row for row in rows},
+            'by_slug': {row['slug']: row for row in rows},
+        }
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._checked_at < settings.TAXONOMY_CACHE_CHECK_INTERVAL:
+            self.hits += 1
+            return snapshot
+
+        with self._lock:
+            version = get_version(self.version_key)
+            self.version_checks += 1
+            self._checked_at = now
+            if self._snapshot is not None and self._snapshot['version'] == version:
+                self.hits += 1
+                return self._snapshot
+            self.misses += 1
+            self._snapshot = self._load(version)
+            return self._snapshot
+
+    def rows(self):
+        """All rows as ``{'id', 'name', 'slug'}`` dicts ordered by id; shared, do not modify"""
+        return self.snapshot()['rows']
+
+    def get(self, slug):
+        by_slug = self.snapshot()['by_slug']
+        if by_slug is None:
+            return None
+        return by_slug.get(slug)
+
+    def by_id(self):
+        return self.snapshot()['by_id']
+
+    def invalidate(self):
+        # Drop the local copy right away; other workers follow once the
+        # shared counter is bumped after commit
+        self._snapshot = None
+        self._checked_at = 0.0
+        transaction.on_commit(lambda: bump_versions([self.version_key]))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        snapshot = self._snapshot
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'version_checks': self.version_checks,
+            'hit_rate': self.hits / lookups if lookups else None,
+            'rows': len(snapshot['rows']) if snapshot and snapshot['rows'] is not None else None,
+            'version': snapshot['version'] if snapshot else None,
+        }
+
+
+categories = TaxonomyCache(Category)
+tags = TaxonomyCache(Tag)
+
+CACHES_BY_MODEL = {
+    Category: categories,
+    Tag: tags,
+}
+
+CACHES_BY_FIELD = {
+    'categories': categories,
+    'tags': tags,
+}
+
+
+def invalidate_taxonomy(model):
+    CACHES_BY_MODEL[model].invalidate()
@@ -1,3 +1,1082 @@
-from django.test import TestCase
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APITestCase
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+try:
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
+
+from .authentication import TokenClaimsUser, revocation_list, user_cache
+from .media import RangeNotSatisfiable, parse_range
+from .models import Post, Category, Tag, PostImage, Reaction, RevokedToken
+from .management.commands.profile_startup import parse_importtime
+from .pagination import EstimatedCountPaginator, StandardResultsSetPagination
+from .renderers import FastJSONRenderer
+from .rendering import MARKDOWN_EXTENSIONS, render_markdown
+from .serializers import PostListSerializer, CategorySerializer, TagSerializer
+from .slugs import allocate_slugs, bulk_create_with_slugs
+from .storage import ContentAddressedFileSystemStorage
+from .taxonomy import resolve_names, assign_taxonomy
+from .taxonomy_cache import CACHES_BY_MODEL
+from .throttling import SQLiteBucketStore, TokenBucketThrottle
+from .versioning import CacheVersionStore, SQLiteVersionStore, bump_versions
+
+# Keeps API tests off the shared throttle file
+TEST_THROTTLE_STORE = {'BACKEND': 'blog.throttling.CacheBucketStore'}
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Changelists must run a fixed number of queries, however many rows they show"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.category = Category.objects.create(name='News')
+        cls.tag = Tag.objects.create(name='Django')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def create_rows(self, count):
+        start = Post.objects.count()
+        for i in range(start, start + count):
+            user = User.objects.create_user(f'reader{i}')
+            post = Post.objects.create(title=f'Post {i}', content='Body', author=user)
+            post.categories.add(self.category)
+            post.tags.add(self.tag)
+            PostImage.objects.create(post=post, image=f'blog/posts/post-{i}/image.png')
+            Reaction.objects.create(post=post, user=self.admin, reaction_type=Reaction.LIKE)
+            Reaction.objects.create(post=post, user=user, reaction_type=Reaction.DISLIKE)
+
+    def assertChangelistQueries(self, model, num):
+        url = reverse(f'admin:blog_{model._meta.model_name}_changelist')
+        for count in (2, 10):
+            self.create_rows(count)
+            with self.assertNumQueries(num):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_post_changelist(self):
+        self.assertChangelistQueries(Post, 5)
+
+    def test_reaction_changelist(self):
+        self.assertChangelistQueries(Reaction, 4)
+
+    def test_post_image_changelist(self):
+        self.assertChangelistQueries(PostImage, 4)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author')
+        for i in range(3):
+            Post.objects.create(title=f'Post {i}', content='Body', author=author, published=i == 0)
+
+    def postgresql(self, estimate):
+        # Stands in for a PostgreSQL connection whose pg_class estimate is ``estimate``
+        connection = mock.MagicMock(vendor='postgresql')
+        connection.ops.quote_name.side_effect = lambda name: f'"{name}"'
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (estimate,)
+        return mock.patch('blog.pagination.connections', {'default': connection}), cursor
+
+    def test_large_unfiltered_table_uses_estimate(self):
+        patch, cursor = self.postgresql(50000)
+        with patch, self.assertNumQueries(0):
+            self.assertEqual(EstimatedCountPaginator(Post.objects.all(), 100).count, 50000)
+        self.assertEqual(cursor.execute.call_args[0][1], ['"blog_post"'])
+
+    def test_small_table_is_counted(self):
+        patch, _ = self.postgresql(500)
+        with patch, self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(Post.objects.all(), 100).count, 3)
+
+    def test_filtered_queryset_is_counted(self):
+        patch, cursor = self.postgresql(50000)
+        with patch:
+            self.assertEqual(EstimatedCountPaginator(Post.objects.filter(published=True), 100).count, 1)
+        cursor.execute.assert_not_called()
+
+    def test_other_databases_are_counted(self):
+        self.assertEqual(EstimatedCountPaginator(Post.objects.all(), 100).count, 3)
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE)
+class FastListParityTests(TestCase):
+    """The .values() list path must render byte-for-byte like the serializers"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author')
+        reader = User.objects.create_user('reader')
+        news = Category.objects.create(name='News')
+        guides = Category.objects.create(name='Guides \u00e9')
+        django = Tag.objects.create(name='Django')
+        python = Tag.objects.create(name='Python')
+
+        for i in range(5):
+            post = Post.objects.create(
+                title=f'Post {i} \u2028 \u00fc "quoted"',
+                content='Body',
+                author=author,
+                published=i != 3,
+                featured_image=f'blog/posts/post-{i}/cover.png' if i % 2 else None,
+            )
+            if i % 2:
+                post.categories.add(news)
+            post.categories.add(guides)
+            post.tags.add(python, django)
+            Reaction.objects.create(post=post, user=reader, reaction_type=Reaction.LIKE)
+            if i % 2:
+                Reaction.objects.create(post=post, user=author, reaction_type=Reaction.DISLIKE)
+
+    def setUp(self):
+        cache.clear()
+
+    def expected(self, response, queryset, serializer_class):
+        request = Request(response.wsgi_request)
+        paginator = StandardResultsSetPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        data = serializer_class(page, many=True, context={'request': request}).data
+        return JSONRenderer().render(paginator.get_paginated_response(data).data)
+
+    def test_post_list(self):
+        for url in ('/api/posts/', '/api/posts/?page_size=2&page=2'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response.content,
+                self.expected(response, Post.objects.filter(published=True), PostListSerializer)
+            )
+
+    def test_taxonomy_lists(self):
+        for url, model, serializer_class in (
+            ('/api/categories/', Category, CategorySerializer),
+            ('/api/tags/', Tag, TagSerializer),
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response.content,
+                self.expected(response, model.objects.order_by('pk'), serializer_class)
+            )
+
+    def test_renderer_matches_stock_output_for_floats(self):
+        data = {'big': 1e16, 'small': [1e-7, 0.5], 'text': 'caf\u00e9 \u2028', 'n': 3}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render({'n': [3, 'x']}), JSONRenderer().render({'n': [3, 'x']}))
+        with self.assertRaises(ValueError):
+            FastJSONRenderer().render({'score': float('nan')})
+
+
+class ResolveNamesTests(TestCase):
+    def test_reuses_existing_and_creates_missing_in_order(self):
+        python = Tag.objects.create(name='Python')
+        tags = resolve_names(Tag, ['Django', ' Python ', '', 'Django', 'C++'])
+        self.assertEqual([tag.name for tag in tags], ['Django', 'Python', 'C++'])
+        self.assertEqual(tags[1], python)
+        self.assertEqual(Tag.objects.count(), 3)
+
+    def test_matches_existing_names_ignoring_case(self):
+        python = Tag.objects.create(name='Python')
+        tags = resolve_names(Tag, ['python', 'DJANGO', 'Django'])
+        self.assertEqual(tags[0], python)
+        self.assertEqual([tag.name for tag in tags], ['Python', 'DJANGO'])
+        self.assertEqual(Tag.objects.count(), 2)
+        self.assertEqual(resolve_names(Category, ['news'], create=False), [])
+
+    def test_clashing_slugs_get_suffixes(self):
+        tags = resolve_names(Tag, ['C', 'C!', 'c?'])
+        self.assertEqual([tag.slug for tag in tags], ['c', 'c-2', 'c-3'])
+
+    def test_lookup_only(self):
+        Category.objects.create(name='News')
+        categories = resolve_names(Category, ['News', 'Missing'], create=False)
+        self.assertEqual([category.name for category in categories], ['News'])
+        self.assertFalse(Category.objects.filter(name='Missing').exists())
+
+
+class AssignTaxonomyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author')
+        cls.posts = [
+            Post.objects.create(title=f'Post {i}', content='Body', author=author)
+            for i in range(3)
+        ]
+        cls.post_ids = [post.pk for post in cls.posts]
+        cls.news, cls.guides = resolve_names(Category, ['News', 'Guides'])
+        cls.python, cls.django = resolve_names(Tag, ['Python', 'Django'])
+
+    def names(self, post, field):
+        return sorted(getattr(post, field).values_list('name', flat=True))
+
+    def test_add(self):
+        self.posts[0].tags.add(self.python)
+        assign_taxonomy(self.post_ids, categories=[self.news], tags=[self.python, self.django])
+        for post in self.posts:
+            self.assertEqual(self.names(post, 'categories'), ['News'])
+            self.assertEqual(self.names(post, 'tags'), ['Django', 'Python'])
+
+    def test_replace(self):
+        assign_taxonomy(self.post_ids, categories=[self.news], tags=[self.python])
+        assign_taxonomy(self.post_ids[:2], categories=[self.guides], mode='replace')
+        self.assertEqual(self.names(self.posts[0], 'categories'), ['Guides'])
+        self.assertEqual(self.names(self.posts[2], 'categories'), ['News'])
+        # Tags were left as None and must not be touched
+        self.assertEqual(self.names(self.posts[0], 'tags'), ['Python'])
+
+    def test_remove(self):
+        assign_taxonomy(self.post_ids, tags=[self.python, self.django])
+        assign_taxonomy(self.post_ids[1:], tags=[self.python], mode='remove')
+        self.assertEqual(self.names(self.posts[0], 'tags'), ['Django', 'Python'])
+        self.assertEqual(self.names(self.posts[1], 'tags'), ['Django'])
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE)
+class TaxonomyByNameAPITests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        for i in range(2):
+            Post.objects.create(title=f'Post {i}', content='Body', author=cls.admin)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def test_resolve(self):
+        Tag.objects.create(name='Python')
+        response = self.client.post('/api/tags/resolve/', {'names': ['Python', 'Django']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([tag['name'] for tag in response.json()], ['Python', 'Django'])
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_resolve_requires_admin(self):
+        self.client.force_authenticate(None)
+        response = self.client.post('/api/tags/resolve/', {'names': ['Python']}, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Tag.objects.exists())
+
+    def test_bulk_taxonomy(self):
+        response = self.client.post('/api/posts/bulk_taxonomy/', {
+            'posts': ['post-0', 'post-1'],
+            'category_names': ['News'],
+            'tag_names': ['Python', 'Django'],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['posts'], 2)
+        for post in Post.objects.all():
+            self.assertEqual(post.tags.count(), 2)
+            self.assertEqual(post.categories.get().name, 'News')
+
+    def test_bulk_taxonomy_unknown_post(self):
+        response = self.client.post('/api/posts/bulk_taxonomy/', {
+            'posts': ['post-0', 'missing'],
+            'tag_names': ['Python'],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['posts'], ['missing'])
+        self.assertFalse(Tag.objects.exists())
+
+    def test_bulk_taxonomy_is_atomic(self):
+        with mock.patch('blog.views.assign_taxonomy', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self.client.post('/api/posts/bulk_taxonomy/', {
+                    'posts': ['post-0'],
+                    'tag_names': ['Python'],
+                }, format='json')
+        self.assertFalse(Tag.objects.exists())
+
+    def test_create_post_with_names(self):
+        Tag.objects.create(name='Python')
+        response = self.client.post('/api/posts/', {
+            'title': 'New post',
+            'content': 'Body',
+            'category_names': ['News'],
+            'tag_names': ['Python', 'Fresh'],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        post = Post.objects.get(slug='new-post')
+        self.assertEqual(sorted(post.tags.values_list('name', flat=True)), ['Fresh', 'Python'])
+        self.assertEqual(post.categories.get().name, 'News')
+
+    def test_create_post_is_atomic(self):
+        with mock.patch('blog.serializers.resolve_names', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self.client.post('/api/posts/', {
+                    'title': 'New post',
+                    'content': 'Body',
+                    'tag_names': ['Python'],
+                }, format='json')
+        self.assertFalse(Post.objects.filter(slug='new-post').exists())
+
+
+class SlugAllocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author')
+
+    def create_post(self, title):
+        return Post.objects.create(title=title, content='Body', author=self.author)
+
+    def test_duplicate_titles(self):
+        slugs = [self.create_post('Hello World').slug for _ in range(3)]
+        self.assertEqual(slugs, ['hello-world', 'hello-world-2', 'hello-world-3'])
+
+    def test_fills_lowest_free_suffix(self):
+        for title in ('Hello World', 'Hello World 2020', 'Hello World and more'):
+            self.create_post(title)
+        self.assertEqual(self.create_post('Hello World').slug, 'hello-world-2')
+
+    def test_single_query_for_candidates_only(self):
+        for title in ('The', 'The end', 'Theory', 'The 3'):
+            self.create_post(title)
+        with CaptureQueriesContext(connection) as queries:
+            slugs = allocate_slugs(Post, ['The', 'The', 'Fresh'])
+        self.assertEqual(slugs, ['the-2', 'the-4', 'fresh'])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('ORDER BY', queries[0]['sql'])
+
+    def test_long_titles_are_truncated(self):
+        title = 'word ' * 100
+        slugs = [self.create_post(title).slug for _ in range(12)]
+        self.assertEqual(len(set(slugs)), 12)
+        self.assertTrue(all(len(slug) <= 250 for slug in slugs))
+        self.assertEqual(slugs[11][-3:], '-12')
+
+    def test_blank_slug_falls_back_to_model_name(self):
+        self.assertEqual(Tag.objects.create(name='!!!').slug, 'tag')
+        self.assertEqual(Tag.objects.create(name='???').slug, 'tag-2')
+
+    def test_save_retries_after_losing_race(self):
+        self.create_post('Taken')
+        with mock.patch('blog.slugs.allocate_slugs', side_effect=[['taken'], ['taken-2']]) as allocate:
+            post = self.create_post('Taken')
+        self.assertEqual(post.slug, 'taken-2')
+        self.assertEqual(allocate.call_count, 2)
+
+    def test_save_gives_up_after_attempts(self):
+        self.create_post('Taken')
+        with mock.patch('blog.slugs.allocate_slugs', return_value=['taken']):
+            with self.assertRaises(IntegrityError):
+                self.create_post('Taken')
+
+    def test_bulk_create(self):
+        Tag.objects.create(name='Python')
+        tags = [
+            Tag(name='Python'), Tag(name='python!'), Tag(name='Go', slug='python-2'),
+            Tag(name='Rust'), Tag(name='Python'),
+        ]
+        created = bulk_create_with_slugs(Tag, tags, 'name', batch_size=4)
+        self.assertEqual(
+            [tag.slug for tag in created],
+            ['python-3', 'python-4', 'python-2', 'rust', 'python-5']
+        )
+        self.assertEqual(Tag.objects.count(), 6)
+
+    def test_bulk_create_retries_batch(self):
+        Tag.objects.create(name='Python')
+        with mock.patch('blog.slugs.allocate_slugs', side_effect=[['python'], ['python-2']]):
+            created = bulk_create_with_slugs(Tag, [Tag(name='Python')], 'name')
+        self.assertEqual([tag.slug for tag in created], ['python-2'])
+        self.assertEqual(allocate_slugs(Tag, ['Python']), ['python-3'])
+
+
+class SQLiteBucketStoreTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, 'throttle.sqlite3')
+        self.store = SQLiteBucketStore(self.path)
+
+    def test_capacity_and_refill(self):
+        # 3 tokens, refilled at one per second
+        for _ in range(3):
+            self.assertEqual(self.store.consume('k', 3, 1.0, 100.0), (True, 0.0))
+        allowed, wait = self.store.consume('k', 3, 1.0, 100.0)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 1.0)
+
+        self.assertTrue(self.store.consume('k', 3, 1.0, 101.5)[0])
+        allowed, wait = self.store.consume('k', 3, 1.0, 101.5)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 0.5)
+        # Never refills past capacity
+        for _ in range(3):
+            self.assertTrue(self.store.consume('k', 3, 1.0, 1000.0)[0])
+        self.assertFalse(self.store.consume('k', 3, 1.0, 1000.0)[0])
+
+    def test_shared_between_connections(self):
+        other = SQLiteBucketStore(self.path)
+        self.assertTrue(self.store.consume('k', 2, 1.0, 100.0)[0])
+        self.assertTrue(other.consume('k', 2, 1.0, 100.0)[0])
+        self.assertFalse(self.store.consume('k', 2, 1.0, 100.0)[0])
+        self.assertTrue(other.consume('other', 2, 1.0, 100.0)[0])
+
+    def test_prunes_refilled_buckets(self):
+        self.store.PRUNE_EVERY = 3
+        self.store.consume('old', 2, 1.0, 100.0)
+        self.store.consume('new', 2, 1.0, 200.0)
+        self.store.consume('new', 2, 1.0, 200.0)
+        keys = [row[0] for row in self.store._connection().execute('SELECT key FROM buckets')]
+        self.assertEqual(keys, ['new'])
+
+
+class VersionStoreTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, 'versions.sqlite3')
+        self.store = SQLiteVersionStore(self.path)
+
+    def test_bumps_are_shared_and_never_lost(self):
+        start = self.store.get_many(['a', 'b'])
+        others = [SQLiteVersionStore(self.path) for _ in range(4)]
+
+        def bump(store):
+            for _ in range(25):
+                store.bump(['a'])
+
+        threads = [threading.Thread(target=bump, args=(store,)) for store in others]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.store.get_many(['a', 'b']), {'a': start['a'] + 100, 'b': start['b']})
+
+    def test_bump_creates_missing_counter(self):
+        self.store.bump(['new'])
+        version = self.store.get_many(['new'])['new']
+        self.store.bump(['new'])
+        self.assertEqual(self.store.get_many(['new']), {'new': version + 1})
+
+    def test_cache_store_refuses_non_atomic_backends(self):
+        with self.assertRaises(ImproperlyConfigured):
+            CacheVersionStore()
+
+
+# Generous global limits so that only the per-action scopes kick in
+TEST_THROTTLE_RATES = {'anon': '1000/min', 'user': '1000/min', 'react': '3/min', 'uploads': '2/hour'}
+
+
+@mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', TEST_THROTTLE_RATES)
+class ActionThrottleTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.post = Post.objects.create(title='Post', content='Body', author=cls.admin, published=True)
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        store = {
+            'BACKEND': 'blog.throttling.SQLiteBucketStore',
+            'OPTIONS': {'path': os.path.join(tmpdir.name, 'throttle.sqlite3')},
+        }
+        settings_override = override_settings(THROTTLE_STORE=store)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.clock = mock.Mock(return_value=1000.0)
+        timer_patch = mock.patch.object(TokenBucketThrottle, 'timer', self.clock)
+        timer_patch.start()
+        self.addCleanup(timer_patch.stop)
+        self.client.force_authenticate(self.admin)
+
+    def react(self):
+        return self.client.post(f'/api/posts/{self.post.slug}/react/', {'reaction_type': 'like'})
+
+    def test_react_limit_and_refill(self):
+        for _ in range(3):
+            self.assertEqual(self.react().status_code, 200)
+        response = self.react()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+        # Other actions are not limited by the react scope
+        self.assertEqual(self.client.get('/api/posts/').status_code, 200)
+
+        self.clock.return_value += 20
+        self.assertEqual(self.react().status_code, 200)
+        self.assertEqual(self.react().status_code, 429)
+
+    def test_uploads_limit(self):
+        url = f'/api/posts/{self.post.slug}/upload_images/'
+        for _ in range(2):
+            self.assertEqual(self.client.post(url).status_code, 400)
+        self.assertEqual(self.client.post(url).status_code, 429)
+        # Scopes are separate buckets
+        self.assertEqual(self.react().status_code, 200)
+
+    def test_busy_store_lets_requests_through(self):
+        writer = sqlite3.connect(settings.THROTTLE_STORE['OPTIONS']['path'], isolation_level=None)
+        self.addCleanup(writer.close)
+        self.react()
+        writer.execute('BEGIN IMMEDIATE')
+        try:
+            with self.assertLogs('blog.throttling', 'WARNING'):
+                for _ in range(5):
+                    self.assertEqual(self.react().status_code, 200)
+        finally:
+            writer.execute('ROLLBACK')
+        # Requests let through while busy took no tokens
+        for _ in range(2):
+            self.assertEqual(self.react().status_code, 200)
+        self.assertEqual(self.react().status_code, 429)
+
+    def test_anonymous_requests_use_one_bucket(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/posts/').status_code, 200)
+        with sqlite3.connect(settings.THROTTLE_STORE['OPTIONS']['path']) as conn:
+            keys = [row[0] for row in conn.execute('SELECT key FROM buckets')]
+        self.assertEqual(len(keys), 1)
+        self.assertIn('anon', keys[0])
+
+    def test_limits_are_per_user(self):
+        for _ in range(3):
+            self.react()
+        self.assertEqual(self.react().status_code, 429)
+        self.client.force_authenticate(User.objects.create_user('reader'))
+        self.assertEqual(self.react().status_code, 200)
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE)
+class JWTAuthenticationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.reader = User.objects.create_user('reader', 'reader@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+        revocation_list.clear()
+        user_cache.clear()
+
+    def obtain(self, username):
+        response = self.client.post('/api/token/', {'username': username, 'password': 'password'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def authorize(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_claims_only_user(self):
+        self.authorize(self.obtain('admin')['access'])
+        self.assertEqual(self.client.get('/api/taxonomy-cache/').status_code, 200)
+        # The revocation list is fresh now; staff checks need no user row
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/taxonomy-cache/').status_code, 200)
+
+        self.authorize(self.obtain('reader')['access'])
+        self.assertEqual(self.client.get('/api/taxonomy-cache/').status_code, 403)
+
+    def test_claims_user_loads_lazily(self):
+        user = TokenClaimsUser(AccessToken(self.obtain('reader')['access']))
+        with self.assertNumQueries(0):
+            self.assertEqual((user.pk, user.username, user.is_staff), (self.reader.pk, 'reader', False))
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'reader@example.com')
+
+    def test_refresh_rereads_claims(self):
+        refresh = self.obtain('reader')['refresh']
+        User.objects.filter(pk=self.reader.pk).update(is_staff=True)
+        with self.assertNumQueries(2):
+            # Revocation list refresh and the user row
+            response = self.client.post('/api/token/refresh/', {'refresh': refresh})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(AccessToken(response.json()['access'])['is_staff'])
+
+    def test_refresh_inactive_user(self):
+        refresh = self.obtain('reader')['refresh']
+        User.objects.filter(pk=self.reader.pk).update(is_active=False)
+        response = self.client.post('/api/token/refresh/', {'refresh': refresh})
+        self.assertEqual(response.status_code, 401)
+
+    def test_revoke_access_and_refresh(self):
+        tokens = self.obtain('reader')
+        self.authorize(tokens['access'])
+        response = self.client.post('/api/token/revoke/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'revoked': 2})
+
+        self.assertEqual(self.client.post('/api/token/revoke/').status_code, 401)
+        self.client.credentials()
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+
+        # Other workers pick revocations up from the database
+        revocation_list.clear()
+        self.authorize(tokens['access'])
+        self.assertEqual(self.client.post('/api/token/revoke/').status_code, 401)
+
+    def test_revocations_committed_out_of_order(self):
+        first, second = self.obtain('reader'), self.obtain('reader')
+        expires_at = timezone.now() + timedelta(days=1)
+        first_jti = AccessToken(first['access'])['jti']
+        second_jti = AccessToken(second['access'])['jti']
+        # The later id commits first and is seen by this worker...
+        RevokedToken.objects.create(pk=11, jti=second_jti, expires_at=expires_at)
+        self.assertTrue(revocation_list.is_revoked(second_jti))
+        # ...then the earlier id commits
+        RevokedToken.objects.create(pk=10, jti=first_jti, expires_at=expires_at)
+        with override_settings(JWT_REVOCATION_REFRESH=0):
+            self.authorize(first['access'])
+            self.assertEqual(self.client.post('/api/token/revoke/').status_code, 401)
+
+    def test_expired_revocations_are_dropped(self):
+        jti = AccessToken(self.obtain('reader')['access'])['jti']
+        revocation_list.add(jti, timezone.now() - timedelta(seconds=1))
+        with override_settings(JWT_REVOCATION_REFRESH=0):
+            self.assertFalse(revocation_list.is_revoked(jti))
+
+    def test_revoke_other_users_refresh(self):
+        refresh = self.obtain('admin')['refresh']
+        self.authorize(self.obtain('reader')['access'])
+        response = self.client.post('/api/token/revoke/', {'refresh': refresh})
+        self.assertEqual(response.status_code, 403)
+        self.client.credentials()
+        self.assertEqual(self.client.post('/api/token/refresh/', {'refresh': refresh}).status_code, 200)
+
+
+class UserCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader')
+
+    def setUp(self):
+        user_cache.clear()
+
+    def test_ttl(self):
+        with mock.patch('blog.authentication.time.monotonic', return_value=100.0) as monotonic:
+            with self.assertNumQueries(1):
+                user_cache.get(self.user.pk)
+                user_cache.get(self.user.pk)
+            monotonic.return_value = 100.0 + 31
+            with self.assertNumQueries(1):
+                user_cache.get(self.user.pk)
+
+    def test_returns_copies(self):
+        user = user_cache.get(self.user.pk)
+        user.first_name = 'Changed'
+        self.assertEqual(user_cache.get(self.user.pk).first_name, '')
+
+    @override_settings(JWT_USER_CACHE_TTL=0)
+    def test_disabled(self):
+        with self.assertNumQueries(2):
+            user_cache.get(self.user.pk)
+            user_cache.get(self.user.pk)
+
+    @override_settings(JWT_USER_CACHE_SIZE=1)
+    def test_size_bound(self):
+        other = User.objects.create_user('other')
+        user_cache.get(self.user.pk)
+        user_cache.get(other.pk)
+        with self.assertNumQueries(1):
+            user_cache.get(self.user.pk)
+
+
+class ParseRangeTests(TestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+        self.assertEqual(parse_range('bytes=990-5000', 1000), (990, 999))
+
+    def test_whole_file(self):
+        for header in ('bytes=0-1,5-9', 'items=0-9', 'bytes=-', 'bytes=9-2'):
+            self.assertIsNone(parse_range(header, 1000))
+
+    def test_not_satisfiable(self):
+        for header in ('bytes=1000-', 'bytes=2000-3000', 'bytes=-0'):
+            with self.assertRaises(RangeNotSatisfiable):
+                parse_range(header, 1000)
+
+
+class ServeMediaTests(TestCase):
+    body = bytes(range(256)) * 4
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        os.makedirs(os.path.join(tmpdir.name, 'blog'))
+        with open(os.path.join(tmpdir.name, 'blog', 'file.png'), 'wb') as f:
+            f.write(self.body)
+        settings_override = override_settings(MEDIA_ROOT=tmpdir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.url = '/media/blog/file.png'
+
+    def test_full_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.body)
+        self.assertEqual(response['Content-Length'], '1024')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('public', response['Cache-Control'])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.body[100:200])
+        self.assertEqual(response['Content-Range'], 'bytes 100-199/1024')
+        self.assertEqual(response['Content-Length'], '100')
+
+    def test_if_range(self):
+        etag = self.client.head(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], '1024')
+
+    def test_not_satisfiable(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_head_with_range(self):
+        response = self.client.head(self.url, HTTP_RANGE='bytes=1000-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 1000-1023/1024')
+        self.assertEqual(response['Content-Length'], '24')
+        self.assertEqual(response.content, b'')
+
+    def test_missing_and_outside_root(self):
+        self.assertEqual(self.client.get('/media/blog/missing.png').status_code, 404)
+        self.assertEqual(self.client.get('/media/blog').status_code, 404)
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT_PREFIX='/protected/')
+    def test_accel_redirect(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/blog/file.png')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Sendfile')
+    def test_sendfile(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], os.path.join(settings.MEDIA_ROOT, 'blog', 'file.png'))
+        self.assertEqual(response.content, b'')
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.location = tmpdir.name
+
+    def test_identical_uploads_are_stored_once(self):
+        storage = ContentAddressedFileSystemStorage(location=self.location)
+        first = storage.save('blog/posts/a/cover.PNG', ContentFile(b'same'))
+        second = storage.save('blog/posts/b/other.png', ContentFile(b'same'))
+        third = storage.save('blog/posts/b/other.png', ContentFile(b'different'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+        self.assertRegex(first, r'^blog/cas/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        with storage.open(first) as f:
+            self.assertEqual(f.read(), b'same')
+
+    def test_deduplication_disabled(self):
+        storage = ContentAddressedFileSystemStorage(location=self.location, deduplicate=False)
+        first = storage.save('blog/cover.png', ContentFile(b'same'))
+        second = storage.save('blog/cover.png', ContentFile(b'same'))
+        self.assertEqual(first, 'blog/cover.png')
+        self.assertNotEqual(first, second)
+
+
+@skipUnless(mock_aws, 'moto is not installed')
+class ContentAddressedS3StorageTests(TestCase):
+    """Runs the S3 backend against moto's in-process stand-in"""
+
+    def setUp(self):
+        env = mock.patch.dict(os.environ, {
+            'AWS_ACCESS_KEY_ID': 'testing',
+            'AWS_SECRET_ACCESS_KEY': 'testing',
+            'AWS_DEFAULT_REGION': 'us-east-1',
+        })
+        env.start()
+        self.addCleanup(env.stop)
+        aws = mock_aws()
+        aws.start()
+        self.addCleanup(aws.stop)
+
+        import boto3
+        self.bucket = boto3.resource('s3', region_name='us-east-1').create_bucket(Bucket='media')
+
+    def storage(self, **options):
+        from .s3 import ContentAddressedS3Storage
+        return ContentAddressedS3Storage(bucket_name='media', region_name='us-east-1', **options)
+
+    def test_identical_uploads_are_stored_once(self):
+        storage = self.storage()
+        first = storage.save('blog/posts/a/cover.png', ContentFile(b'same'))
+        second = storage.save('blog/posts/b/cover.png', ContentFile(b'same'))
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith('blog/cas/'))
+        self.assertEqual([obj.key for obj in self.bucket.objects.all()], [first])
+        with storage.open(first) as f:
+            self.assertEqual(f.read(), b'same')
+
+    def test_serve_media_redirects(self):
+        storage = self.storage()
+        name = storage.save('blog/cover.png', ContentFile(b'image'))
+        with mock.patch('blog.media.default_storage', storage):
+            response = self.client.get(f'/media/{name}')
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(f'/{name}', response['Location'])
+
+
+@override_settings(SITE_URL='http://testserver')
+class FeedCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author')
+        cls.category = Category.objects.create(name='News')
+        cls.post = Post.objects.create(title='Hello', content='Body', author=author, published=True)
+        cls.post.categories.add(cls.category)
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(SITE_URL='')
+    def test_links_follow_each_host_uncached(self):
+        with mock.patch('blog.feeds.cache') as feed_cache:
+            for url in ('/feeds/rss/', '/feeds/atom/', '/sitemap.xml', '/sitemap-0.xml'):
+                evil = self.client.get(url, HTTP_HOST='evil.example')
+                self.assertIn(b'http://evil.example/', evil.content)
+                response = self.client.get(url, HTTP_HOST='blog.example')
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn(b'evil.example', response.content)
+                self.assertIn(b'http://blog.example/', response.content)
+                response = self.client.get(
+                    url, HTTP_HOST='blog.example', HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(response.status_code, 304)
+        self.assertEqual(feed_cache.method_calls, [])
+
+    @override_settings(SITE_URL='https://blog.example/')
+    def test_links_use_site_url(self):
+        for url in ('/feeds/rss/', '/feeds/categories/news/atom/', '/sitemap.xml', '/sitemap-0.xml'):
+            self.client.get(url, HTTP_HOST='evil.example')
+            response = self.client.get(url)
+            self.assertNotIn(b'evil.example', response.content)
+            self.assertIn(b'https://blog.example/', response.content)
+        response = self.client.get('/feeds/rss/')
+        self.assertIn(b'<link>https://blog.example/api/posts/hello/</link>', response.content)
+
+    def test_served_from_cache(self):
+        self.client.get('/feeds/categories/news/rss/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/feeds/categories/news/rss/')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/feeds/categories/news/rss/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_post_change_expires_feeds(self):
+        self.client.get('/feeds/categories/news/rss/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.filter(pk=self.post.pk).update(title='Renamed')
+            self.post.refresh_from_db()
+            self.post.save()
+        self.assertIn(b'Renamed', self.client.get('/feeds/categories/news/rss/').content)
+
+    def test_deleted_category_feed(self):
+        self.assertEqual(self.client.get('/feeds/categories/news/rss/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.delete()
+        self.assertEqual(self.client.get('/feeds/categories/news/rss/').status_code, 404)
+
+    def test_renamed_category_slug(self):
+        self.assertEqual(self.client.get('/feeds/categories/news/atom/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.slug = 'headlines'
+            self.category.save()
+        self.assertEqual(self.client.get('/feeds/categories/news/atom/').status_code, 404)
+        self.assertEqual(self.client.get('/feeds/categories/headlines/atom/').status_code, 200)
+
+    def test_deleted_tag_feed(self):
+        tag = Tag.objects.create(name='Python')
+        self.post.tags.add(tag)
+        self.assertEqual(self.client.get('/feeds/tags/python/rss/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.delete()
+        self.assertEqual(self.client.get('/feeds/tags/python/rss/').status_code, 404)
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE)
+class TaxonomyCacheTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.news = Category.objects.create(name='News')
+        cls.python = Tag.objects.create(name='Python')
+        cls.posts = []
+        for i in range(4):
+            post = Post.objects.create(title=f'Post {i}', content='Body', author=cls.admin, published=True)
+            post.categories.add(cls.news)
+            post.tags.add(cls.python)
+            cls.posts.append(post)
+
+    def setUp(self):
+        cache.clear()
+        # Rolled-back rows from other tests never reached the signals
+        for taxonomy_cache in CACHES_BY_MODEL.values():
+            taxonomy_cache.invalidate()
+
+    def serialize(self, posts):
+        with CaptureQueriesContext(connection) as queries:
+            data = PostListSerializer(posts, many=True).data
+        through_queries = [
+            query for query in queries
+            if 'blog_post_categories' in query['sql'] or 'blog_post_tags' in query['sql']
+        ]
+        return data, len(through_queries)
+
+    def test_list_serializer_batches_taxonomy(self):
+        data, through_queries = self.serialize(Post.objects.order_by('pk'))
+        self.assertEqual(through_queries, 2)
+        self.assertEqual([row['categories'] for row in data], [['News']] * 4)
+        self.assertEqual([row['tags'] for row in data], [['Python']] * 4)
+
+        self.assertEqual(PostListSerializer(self.posts[0]).data['tags'], ['Python'])
+
+    def test_taxonomy_endpoints_served_from_cache(self):
+        self.client.get('/api/categories/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/categories/')
+        self.assertEqual(response.json()['results'], [{'id': self.news.pk, 'name': 'News', 'slug': 'news'}])
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/categories/news/')
+        self.assertEqual(response.json(), {'id': self.news.pk, 'name': 'News', 'slug': 'news'})
+        self.assertEqual(self.client.get('/api/categories/missing/').status_code, 404)
+
+    def test_local_save_is_seen_at_once(self):
+        self.client.get('/api/tags/')
+        self.python.name = 'Python 3'
+        self.python.save()
+        self.assertEqual(self.client.get('/api/tags/python/').json()['name'], 'Python 3')
+
+    def test_version_bump_from_another_worker(self):
+        self.client.get('/api/tags/')
+        # A write elsewhere: no signal here, only the shared counter moves
+        Tag.objects.filter(pk=self.python.pk).update(name='Renamed')
+        with override_settings(TAXONOMY_CACHE_CHECK_INTERVAL=60):
+            self.assertEqual(self.client.get('/api/tags/python/').json()['name'], 'Python')
+        bump_versions(['taxonomy:tag'])
+        with override_settings(TAXONOMY_CACHE_CHECK_INTERVAL=0):
+            self.assertEqual(self.client.get('/api/tags/python/').json()['name'], 'Renamed')
+
+    def test_unknown_id_falls_back_to_database(self):
+        self.serialize(self.posts)
+        # Created and attached by another worker within the check interval
+        Tag.objects.bulk_create([Tag(name='Django', slug='django')])
+        self.posts[0].tags.add(Tag.objects.get(slug='django'))
+        with override_settings(TAXONOMY_CACHE_CHECK_INTERVAL=60):
+            data, _ = self.serialize(self.posts[:1])
+        self.assertEqual(data[0]['tags'], ['Python', 'Django'])
+
+    @override_settings(TAXONOMY_CACHE_MAX_ROWS=1)
+    def test_table_over_limit_falls_back_to_database(self):
+        Category.objects.create(name='Guides')
+        self.assertIsNone(CACHES_BY_MODEL[Category].rows())
+        response = self.client.get('/api/categories/')
+        self.assertEqual([row['name'] for row in response.json()['results']], ['News', 'Guides'])
+        self.assertEqual(self.client.get('/api/categories/guides/').json()['name'], 'Guides')
+        data, _ = self.serialize(self.posts[:1])
+        self.assertEqual(data[0]['categories'], ['News'])
+
+    def test_stats(self):
+        # Counters are per process, so compare against where they started
+        before = CACHES_BY_MODEL[Tag].stats()
+        self.client.get('/api/tags/')
+        self.client.get('/api/tags/')
+        self.assertEqual(self.client.get('/api/taxonomy-cache/').status_code, 401)
+        self.client.force_authenticate(self.admin)
+        stats = self.client.get('/api/taxonomy-cache/').json()['tags']
+        self.assertEqual(stats['hits'] - before['hits'], 1)
+        self.assertEqual(stats['misses'] - before['misses'], 1)
+        self.assertEqual(stats['rows'], 1)
+
+
+class RenderMarkdownTests(SimpleTestCase):
+    def test_matches_markdown_module(self):
+        import markdown
+
+        text = (
+            '# Title\n\nfirst line\nsecond line\n\n'
+            '```python\nprint("hi")\n```\n\n'
+            '| a | b |\n|---|---|\n| 1 | 2 |\n'
+        )
+        for _ in range(2):
+            self.assertEqual(
+                render_markdown(text), markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+            )
+
+    def test_no_state_between_documents(self):
+        first = render_markdown('[home][site]\n\n[site]: https://example.com/')
+        self.assertIn('href="https://example.com/"', first)
+        second = render_markdown('[home][site]')
+        self.assertNotIn('href', second)
+        self.assertEqual(second, '<p>[home][site]</p>')
+
+
+class StartupTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import json'],
+            capture_output=True, text=True,
+        )
+        rows = list(parse_importtime(result.stderr))
+        modules = [row[0] for row in rows]
+        self.assertIn('json', modules)
+        self.assertNotIn('imported package', modules)
+        for module, self_us, cumulative_us in rows:
+            self.assertEqual(module, module.strip())
+            self.assertGreaterEqual(cumulative_us, self_us)
+
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   json.decoder\n'
+            'import time:       300 |        420 | json\n'
+        )
+        self.assertEqual(
+            list(parse_importtime(output)), [('json.decoder', 120, 120), ('json', 300, 420)]
+        )
+
+    def test_create_application_without_warm_up(self):
+        from blog_project import wsgi
+
+        with mock.patch.object(wsgi, 'warm_up') as warm_up:
+            self.assertTrue(callable(wsgi.create_application(warm=False)))
+            warm_up.assert_not_called()
+            wsgi.create_application(warm=True)
+            warm_up.assert_called_once_with()
@@ -0,0 +1,206 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+from rest_framework.throttling import SimpleRateThrottle, AnonRateThrottle, UserRateThrottle
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets kept in a local SQLite file, shared by every worker
+    process on the host.
+
+    Each key is a single row (tokens left, last update, time the bucket is
+    full again), so a check is one primary-key read and one upsert inside a
+    write transaction, and memory does not grow with the request rate.
+
+    Those transactions take microseconds, so the lock ``timeout`` is kept
+    short: a stalled writer makes checks fail (and the throttle let the
+    request through) rather than queue every worker behind it.
+    """
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path, timeout=0.1):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                ' key TEXT PRIMARY KEY,'
+                ' tokens REAL NOT NULL,'
+                ' updated REAL NOT NULL,'
+                ' full_at REAL NOT NULL'
+                ') WITHOUT ROWID'
+            )
+            self._local.conn = conn
+            self._local.calls = 0
+        return conn
+
+    def consume(self, key, capacity, rate, now):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated FROM buckets WHERE key = ?', (key,)
+            ).fetchone()
+            allowed, tokens, wait = _take(row, capacity, rate, now)
+            conn.execute(
+                'INSERT INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, '
+                'updated = excluded.updated, full_at = excluded.full_at',
+                (key, tokens, now, now + (capacity - tokens) / rate),
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+        self._local.calls += 1
+        if self._local.calls % self.PRUNE_EVERY == 0:
+            # A bucket that has refilled is the same as no bucket at all;
+            # if the table is busy, the next round will do
+            try:
+                conn.execute('DELETE FROM buckets WHERE full_at < ?', (now,))
+            except sqlite3.OperationalError:
+                pass
+        return allowed, wait
+
+
+class CacheBucketStore:
+    """
+    Token buckets kept in a Django cache. Only as shared as the cache
+    backend is, and the read-modify-write is not atomic, so concurrent
+    requests may occasionally both get the last token.
+    """
+    def __init__(self, alias='default', prefix='throttle'):
+        self.cache = caches[alias]
+        self.prefix = prefix
+
+    def consume(self, key, capacity, rate, now):
+        cache_key = f'{self.prefix}:{key}'
+        allowed, tokens, wait = _take(self.cache.get(cache_key), capacity, rate, now)
+        self.cache.set(cache_key, (tokens, now), timeout=int((capacity - tokens) / rate) + 1)
+        return allowed, wait
+
+
+def _take(row, capacity, rate, now):
+    """Refill a bucket stored as ``(tokens, updated)`` and try to take a token"""
+    if row is None:
+        tokens = float(capacity)
+    else:
+        tokens, updated = row
+        tokens = min(float(capacity), tokens + max(0.0, now - updated) * rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / rate
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        config = settings.THROTTLE_STORE
+        _store = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _store
+
+
+def _reset_store(*, setting, **kwargs):
+    global _store
+    if setting == 'THROTTLE_STORE':
+        _store = None
+
+
+setting_changed.connect(_reset_store)
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Rate throttle using a token bucket per client instead of DRF's list of
+    request timestamps: the bucket holds ``num_requests`` tokens and refills
+    continuously over ``duration``.
+    """
+    timer = time.time
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        try:
+            allowed, self._wait = get_store().consume(
+                self.key, self.num_requests, self.num_requests / self.duration, self.timer()
+            )
+        except sqlite3.OperationalError:
+            # A busy or broken store must not take the API down with it
+            logger.warning('Throttle store unavailable, allowing request', exc_info=True)
+            return True
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class AnonBucketThrottle(TokenBucketThrottle, AnonRateThrottle):
+    """Limits anonymous clients by IP, using the ``anon`` rate"""
+
+
+class UserBucketThrottle(TokenBucketThrottle, UserRateThrottle):
+    """
+    Limits authenticated clients by user id, using the ``user`` rate.
+    Anonymous clients are left to ``AnonBucketThrottle``, so they cost one
+    bucket update per request rather than two.
+    """
+    def get_cache_key(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return None
+        return super().get_cache_key(request, view)
+
+
+class ActionBucketThrottle(TokenBucketThrottle):
+    """
+    Per-action limits. Views map action names to rate scopes with
+    ``throttle_scopes``, e.g. ``{'react': 'react'}``; actions without an
+    entry are not limited by this throttle.
+    """
+    scope_attr = 'throttle_scopes'
+
+    def __init__(self):
+        # The scope depends on the view, so the rate is resolved in allow_request
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, {}).get(getattr(view, 'action', None))
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
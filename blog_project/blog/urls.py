@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PostViewSet, CategoryViewSet, TagViewSet
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .views import PostViewSet, CategoryViewSet, TagViewSet, revoke_token, taxonomy_cache_stats
 
 from rest_framework.permissions import AllowAny
 
@@ -11,5 +12,9 @@ router.register(r'tags', TagViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/revoke/', revoke_token, name='token_revoke'),
+    path('taxonomy-cache/', taxonomy_cache_stats, name='taxonomy_cache_stats'),
 ]
 
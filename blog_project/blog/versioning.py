@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+
+# Version stamps shared by all workers. Cached content is stored under
+# "<key>:<version>", so bumping a version makes the old entries unreachable
+# without having to find and delete them. A bump that is lost or undone
+# would serve stale content indefinitely, so the counters live in a store
+# that increments atomically and never expires them (settings.VERSION_STORE).
+
+
+def _initial():
+    # Start from the clock rather than 0 so that a counter that is lost
+    # (store wiped, cache flushed) never comes back at a version some stale
+    # entry still uses
+    return int(time.time() * 1000)
+
+
+class SQLiteVersionStore:
+    """
+    Counters kept in a local SQLite file, shared by every worker process on
+    the host. A bump is a single upsert, so concurrent bumps never collapse.
+    """
+    def __init__(self, path, timeout=1.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS versions ('
+                ' key TEXT PRIMARY KEY,'
+                ' version INTEGER NOT NULL'
+                ') WITHOUT ROWID'
+            )
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys):
+        conn = self._connection()
+        placeholders = ', '.join('?' * len(keys))
+        query = f'SELECT key, version FROM versions WHERE key IN ({placeholders})'
+        versions = dict(conn.execute(query, keys).fetchall())
+        missing = [key for key in keys if key not in versions]
+        if missing:
+            initial = _initial()
+            conn.executemany(
+                'INSERT OR IGNORE INTO versions (key, version) VALUES (?, ?)',
+                [(key, initial) for key in missing],
+            )
+            versions.update(conn.execute(query, keys).fetchall())
+        return versions
+
+    def bump(self, keys):
+        initial = _initial()
+        self._connection().executemany(
+            'INSERT INTO versions (key, version) VALUES (?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET version = version + 1',
+            [(key, initial) for key in keys],
+        )
+
+
+class CacheVersionStore:
+    """
+    Counters kept in a Django cache, for deployments whose cache is shared
+    across hosts. Only backends that increment atomically and leave the
+    expiry alone on increment are accepted.
+    """
+    ATOMIC_BACKENDS = (
+        'django.core.cache.backends.redis.RedisCache',
+        'django.core.cache.backends.memcached.PyMemcacheCache',
+        'django.core.cache.backends.memcached.PyLibMCCache',
+    )
+
+    def __init__(self, alias='default'):
+        backend = settings.CACHES[alias]['BACKEND']
+        if backend not in self.ATOMIC_BACKENDS:
+            raise ImproperlyConfigured(
+                f'CacheVersionStore needs a cache with atomic increments, not {backend}'
+            )
+        self.cache = caches[alias]
+
+    def get_many(self, keys):
+        versions = self.cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                self.cache.add(key, _initial(), timeout=None)
+                versions[key] = self.cache.get(key)
+        return versions
+
+    def bump(self, keys):
+        for key in keys:
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.add(key, _initial(), timeout=None)
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        config = settings.VERSION_STORE
+        _store = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _store
+
+
+def _reset_store(*, setting, **kwargs):
+    global _store
+    if setting == 'VERSION_STORE':
+        _store = None
+
+
+setting_changed.connect(_reset_store)
+
+
+def get_versions(keys):
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+    return get_store().get_many(keys)
+
+
+def get_version(key):
+    return get_versions([key])[key]
+
+
+def bump_versions(keys):
+    keys = sorted(set(keys))
+    if keys:
+        get_store().bump(keys)
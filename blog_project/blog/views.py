@@ -3,15 +3,28 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.renderers import BrowsableAPIRenderer
+from django.db import transaction
 from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
 from django.http import HttpResponse
-from .models import Post, Category, Tag, PostImage, Reaction
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from .models import Post, Category, Tag, PostImage, Reaction, RevokedToken
+from .authentication import revocation_list
 from .serializers import (
     PostSerializer, PostListSerializer, PostDetailSerializer, PostCreateSerializer,
-    CategorySerializer, TagSerializer, PostImageSerializer, ReactionSerializer
+    CategorySerializer, TagSerializer, PostImageSerializer, ReactionSerializer,
+    TaxonomyNamesSerializer, BulkTaxonomySerializer, TokenRevokeSerializer
 )
 from .pagination import StandardResultsSetPagination
+from .renderers import FastJSONRenderer
+from .taxonomy import resolve_names, assign_taxonomy
+from .listing import post_list_rows, POST_LIST_VALUES, TAXONOMY_VALUES
+from .taxonomy_cache import CACHES_BY_MODEL, categories, tags
 
 class IsAdminUserOrReadOnly(IsAuthenticated):
     """
@@ -30,11 +43,16 @@ class PostViewSet(viewsets.ModelViewSet):
     serializer_class = PostSerializer
     pagination_class = StandardResultsSetPagination
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['categories__slug', 'tags__slug', 'published']
     search_fields = ['title', 'content', 'excerpt']
     ordering_fields = ['created_at', 'updated_at', 'title']
     lookup_field = 'slug'
+    throttle_scopes = {
+        'react': 'react',
+        'upload_images': 'uploads',
+    }
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -49,7 +67,7 @@ class PostViewSet(viewsets.ModelViewSet):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        if self.action in ['create', 'update', 'partial_update', 'destroy', 'upload_images']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'upload_images', 'bulk_taxonomy']:
             permission_classes = [IsAdminUser]
         else:
             permission_classes = [AllowAny]
@@ -69,6 +87,14 @@ class PostViewSet(viewsets.ModelViewSet):
         context.update({"request": self.request})
         return context
     
+    def list(self, request, *args, **kwargs):
+        # Plain dicts from .values() instead of PostListSerializer instances
+        queryset = self.filter_queryset(self.get_queryset()).values(*POST_LIST_VALUES)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(post_list_rows(page, request))
+        return Response(post_list_rows(queryset, request))
+    
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
     
@@ -131,14 +157,87 @@ class PostViewSet(viewsets.ModelViewSet):
         
         serializer = ReactionSerializer(reaction)
         return Response(serializer.data, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk_taxonomy(self, request):
+        """Add, replace or remove categories/tags by name on many posts at once"""
+        serializer = BulkTaxonomySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        slugs = set(data['posts'])
+        post_ids = dict(Post.objects.filter(slug__in=slugs).values_list('slug', 'id'))
+        unknown = sorted(slugs - post_ids.keys())
+        if unknown:
+            return Response(
+                {'error': 'Unknown posts', 'posts': unknown},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Removing never creates taxonomy rows, it only looks existing ones up
+        create = data['mode'] != 'remove'
+        categories = tags = None
+        with transaction.atomic():
+            if 'category_names' in data:
+                categories = resolve_names(Category, data['category_names'], create=create)
+            if 'tag_names' in data:
+                tags = resolve_names(Tag, data['tag_names'], create=create)
+            assign_taxonomy(post_ids.values(), categories=categories, tags=tags, mode=data['mode'])
+        
+        return Response({
+            'posts': len(post_ids),
+            'mode': data['mode'],
+            'categories': CategorySerializer(categories or [], many=True).data,
+            'tags': TagSerializer(tags or [], many=True).data,
+        }, status=status.HTTP_200_OK)
+
+class ResolveByNameMixin:
+    """
+    Adds a ``resolve`` action that looks up taxonomy rows by name and
+    creates the missing ones in a single batch.
+    """
+    @action(detail=False, methods=['post'])
+    def resolve(self, request):
+        model = self.get_queryset().model
+        serializer = TaxonomyNamesSerializer(data=request.data, context={'model': model})
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            objs = resolve_names(model, serializer.validated_data['names'])
+        return Response(
+            self.get_serializer(objs, many=True).data,
+            status=status.HTTP_200_OK
+        )
+
+class TaxonomyListMixin:
+    """
+    Serves list and retrieve from the taxonomy cache, falling back to
+    id/name/slug rows straight from .values() when the table is too big to
+    cache; either way the serializer is skipped
+    """
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list(self, request, *args, **kwargs):
+        queryset = CACHES_BY_MODEL[self.queryset.model].rows()
+        if queryset is None:
+            queryset = self.filter_queryset(self.get_queryset()).order_by('pk').values(*TAXONOMY_VALUES)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(list(page))
+        return Response(list(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        row = CACHES_BY_MODEL[self.queryset.model].get(kwargs[self.lookup_field])
+        if row is None:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(row)
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(TaxonomyListMixin, ResolveByNameMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminUserOrReadOnly]
     lookup_field = 'slug'
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(TaxonomyListMixin, ResolveByNameMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [IsAdminUserOrReadOnly]
@@ -160,3 +259,52 @@ def api_root(request, format=None):
         'token_refresh': request.build_absolute_uri('/api/token/refresh/'),
     })
 
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def taxonomy_cache_stats(request):
+    """
+    Hit rates of this worker's category and tag caches
+    """
+    return Response({
+        'categories': categories.stats(),
+        'tags': tags.stats(),
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def revoke_token(request):
+    """
+    Revoke the access token used for this request and, if given, a refresh
+    token belonging to the same user
+    """
+    serializer = TokenRevokeSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    tokens = []
+    if request.auth is not None and hasattr(request.auth, 'payload'):
+        tokens.append(request.auth)
+    if serializer.validated_data.get('refresh'):
+        try:
+            refresh = RefreshToken(serializer.validated_data['refresh'])
+        except TokenError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if str(refresh.get(jwt_settings.USER_ID_CLAIM)) != str(request.user.pk):
+            return Response(
+                {'error': 'Token belongs to another user'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        tokens.append(refresh)
+    
+    now = timezone.now()
+    revoked = []
+    for token in tokens:
+        expires_at = datetime_from_epoch(token['exp'])
+        revoked.append(RevokedToken(jti=token[jwt_settings.JTI_CLAIM], expires_at=expires_at))
+        # Effective at once in this worker, within JWT_REVOCATION_REFRESH elsewhere
+        revocation_list.add(token[jwt_settings.JTI_CLAIM], expires_at)
+    RevokedToken.objects.bulk_create(revoked, ignore_conflicts=True)
+    RevokedToken.objects.filter(expires_at__lte=now).delete()
+    
+    return Response({'revoked': len(revoked)}, status=status.HTTP_200_OK)
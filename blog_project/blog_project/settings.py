@@ -21,6 +21,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -97,6 +98,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'blog.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
@@ -104,12 +106,15 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'blog.throttling.AnonBucketThrottle',
+        'blog.throttling.UserBucketThrottle',
+        'blog.throttling.ActionBucketThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
-        'user': '1000/day'
+        'user': '1000/day',
+        'react': '60/min',
+        'uploads': '30/hour',
     },
     'DEFAULT_PAGINATION_CLASS': 'blog.pagination.StandardResultsSetPagination',
     'DEFAULT_FILTER_BACKENDS': [
@@ -117,6 +122,66 @@ REST_FRAMEWORK = {
     ],
 }
 
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'blog.authentication.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'blog.authentication.ClaimsTokenRefreshSerializer',
+}
+
+# blog.authentication: access tokens are trusted for their lifetime, so a
+# deactivated user keeps access until expiry unless the token is revoked.
+# User rows loaded for a request are reused for JWT_USER_CACHE_TTL seconds
+# (0 disables), and revocations reach other workers within
+# JWT_REVOCATION_REFRESH seconds.
+JWT_USER_CACHE_TTL = 30
+JWT_USER_CACHE_SIZE = 1024
+JWT_REVOCATION_REFRESH = 5
+
+# Shared by all workers on the host; point CACHE_BACKEND/CACHE_LOCATION at
+# e.g. Redis to share it across hosts
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+    }
+}
+
+# Feeds and sitemap shards (blog.feeds) are cached until a post they show
+# changes; FEED_CACHE_TIMEOUT only bounds how long unused entries linger.
+# SITE_URL (e.g. https://blog.example.com) is the origin their absolute
+# URLs use and must be set for them to be cached; when unset they follow
+# the request's host and are rendered on every request.
+SITE_URL = os.environ.get('SITE_URL', '')
+FEED_SIZE = 50
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_MAX_AGE = 60 * 5
+SITEMAP_SHARD_SIZE = 5000
+
+# Per-process category/tag tables (blog.taxonomy_cache): seconds between
+# checks of the shared version counter, and the largest table kept in memory
+TAXONOMY_CACHE_CHECK_INTERVAL = 1
+TAXONOMY_CACHE_MAX_ROWS = 10000
+
+# Version counters for blog.versioning, shared by all workers on the host.
+# When CACHES is shared across hosts, use blog.versioning.CacheVersionStore
+# (Redis or Memcached only) so every host sees the same versions.
+VERSION_STORE = {
+    'BACKEND': 'blog.versioning.SQLiteVersionStore',
+    'OPTIONS': {
+        'path': os.environ.get('VERSION_DB_PATH', os.path.join(BASE_DIR, 'versions.sqlite3')),
+    },
+}
+
+# Token buckets for blog.throttling, shared by all workers on the host
+THROTTLE_STORE = {
+    'BACKEND': 'blog.throttling.SQLiteBucketStore',
+    'OPTIONS': {
+        'path': os.environ.get('THROTTLE_DB_PATH', os.path.join(BASE_DIR, 'throttle.sqlite3')),
+    },
+}
+
 
 
 
@@ -133,6 +198,45 @@ USE_TZ = True
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Media storage: 'local' (MEDIA_ROOT) or 's3' (any S3-compatible endpoint,
+# e.g. MinIO on localhost for development). Both store uploads under their
+# content hash so identical files are kept once.
+MEDIA_STORAGE = os.environ.get('MEDIA_STORAGE', 'local')
+MEDIA_DEDUPLICATE = os.environ.get('MEDIA_DEDUPLICATE', '1') == '1'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'blog.storage.ContentAddressedFileSystemStorage',
+        'OPTIONS': {
+            'deduplicate': MEDIA_DEDUPLICATE,
+        },
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+if MEDIA_STORAGE == 's3':
+    STORAGES['default'] = {
+        'BACKEND': 'blog.s3.ContentAddressedS3Storage',
+        'OPTIONS': {
+            'deduplicate': MEDIA_DEDUPLICATE,
+            'bucket_name': os.environ.get('AWS_STORAGE_BUCKET_NAME'),
+            'endpoint_url': os.environ.get('AWS_S3_ENDPOINT_URL'),
+            'region_name': os.environ.get('AWS_S3_REGION_NAME'),
+            'access_key': os.environ.get('AWS_ACCESS_KEY_ID'),
+            'secret_key': os.environ.get('AWS_SECRET_ACCESS_KEY'),
+            'file_overwrite': True,
+        },
+    }
+
+# blog.media.serve_media hands local files to the front server when one of
+# these is set: an internal nginx location for X-Accel-Redirect
+# (e.g. '/protected-media/') or the header name for X-Sendfile.
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX')
+MEDIA_SENDFILE_HEADER = os.environ.get('MEDIA_SENDFILE_HEADER')
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 30
+
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
@@ -13,4 +13,28 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog_project.settings')
 
-application = get_wsgi_application()
+
+def warm_up():
+    """
+    Do the work a first request would otherwise pay for: import the URLconf
+    (and with it every view, serializer and DRF setting class) and build the
+    Markdown converter. gunicorn.conf.py runs it in the master when
+    ``preload_app`` is on, so it happens once and is shared by all workers;
+    any other server would only pay for it again per process. It opens no
+    database connections, so it is safe before forking.
+    """
+    from django.urls import get_resolver
+    from blog.rendering import get_markdown
+
+    get_resolver().url_patterns
+    get_markdown()
+
+
+def create_application(warm=False):
+    application = get_wsgi_application()
+    if warm:
+        warm_up()
+    return application
+
+
+application = create_application()
@@ -0,0 +1,27 @@
+# Picked up by gunicorn when started from this directory:
+#   gunicorn blog_project.wsgi
+import multiprocessing
+import os
+
+wsgi_app = 'blog_project.wsgi:application'
+
+# Import and warm up the project once in the master (see when_ready and
+# blog_project.wsgi.warm_up); forked workers are ready immediately and
+# share those pages copy-on-write.
+preload_app = True
+
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported and before the
+    # first worker is forked
+    if server.cfg.preload_app:
+        from blog_project.wsgi import warm_up
+        warm_up()
+
+
+def post_fork(server, worker):
+    # Nothing may inherit a connection opened in the master
+    from django.db import connections
+    connections.close_all()